@@ -4,8 +4,15 @@ from beem.comment import Comment
 from datetime import datetime, timezone, timedelta
 import logging
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from tabulate import tabulate
 from beem.utils import formatTimeString
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+from utils.timestamps import parse_timestamp
 
 # Configure logger
 logging.basicConfig(level=logging.INFO)
@@ -20,11 +27,20 @@ class CuratorAnalyzer:
                 "https://api.justyy.com"
             ]
         }
+        # Shared keep-alive session for all raw JSON-RPC calls
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_maxsize=10,
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504),
+                              allowed_methods=frozenset(['GET', 'POST']))
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
     
     def ping_server(self, url):
         """Test if server is reachable"""
         try:
-            response = requests.get(url, timeout=5)
+            response = self.session.get(url, timeout=5)
             return response.status_code == 200
         except:
             return False
@@ -65,15 +81,7 @@ class CuratorAnalyzer:
                 # Process this batch of operations
                 for op in operations:
                     # Parse and validate timestamp
-                    op_timestamp = op.get('timestamp')
-                    if isinstance(op_timestamp, str):
-                        try:
-                            op_timestamp = datetime.strptime(op_timestamp, '%Y-%m-%dT%H:%M:%S').replace(tzinfo=timezone.utc)
-                        except ValueError:
-                            try:
-                                op_timestamp = datetime.fromisoformat(op_timestamp.replace('Z', '+00:00'))
-                            except Exception:
-                                op_timestamp = None
+                    op_timestamp = parse_timestamp(op.get('timestamp'))
                     
                     # If we've reached operations older than our vote cutoff, we can stop
                     if op_timestamp and op_timestamp < vote_cutoff_date:
@@ -119,9 +127,9 @@ class CuratorAnalyzer:
                             )
                             combined_op['vote_value_steem'] = vote_value['steem_value']
                             combined_op['reward_sp'] = steem.vests_to_sp(vesting_shares)
-                            vote_time = datetime.strptime(vote_info['timestamp'], '%Y-%m-%dT%H:%M:%S').replace(tzinfo=timezone.utc)
+                            vote_time = parse_timestamp(vote_info['timestamp'])
                             combined_op['voted_after_minutes'] = (vote_time - created_post).total_seconds() / 60
-                            reward_time = datetime.strptime(reward['timestamp'], '%Y-%m-%dT%H:%M:%S').replace(tzinfo=timezone.utc) if isinstance(reward['timestamp'], str) else reward['timestamp']
+                            reward_time = parse_timestamp(reward['timestamp'])
                             combined_op['days_to_reward'] = (reward_time - vote_time).total_seconds() / 86400  # Convert to days
                         except (ValueError, TypeError):
                             pass
@@ -172,6 +180,8 @@ class CuratorAnalyzer:
             
             # Step 7: Get reward fund con il nuovo metodo - utilizziamo blockchain_connector
             reward_fund = self.get_reward_fund("post")
+            if not reward_fund:
+                raise Exception('Unable to get reward fund')
             
             # Step 8: Calculate rbPrc
             recent_claims = float(reward_fund['recent_claims'])
@@ -188,6 +198,8 @@ class CuratorAnalyzer:
             
             # Step 9: Get median price con il nuovo metodo - utilizziamo blockchain_connector
             price_info = self.get_current_median_history_price()
+            if not price_info:
+                raise Exception('Unable to get median history price')
             
             base_amount = float(price_info['base']['amount'])
             quote_amount = float(price_info['quote']['amount'])
@@ -282,95 +294,97 @@ class CuratorAnalyzer:
         self.format_results(results, username)
     
     def get_reward_fund(self, fund_name="post"):
-        for node_url in self.node_urls.get('steem'):
-            if not self.ping_server(node_url):
-                logger.error(f"Impossibile raggiungere il server: {node_url}")
-                continue
         """Get reward fund information directly from the blockchain.
         
+        Tries each node once, skipping unreachable ones.
+        
         Args:
             fund_name (str): Name of the reward fund, typically "post"
             
         Returns:
-            dict: Reward fund data with relevant information
+            dict: Reward fund data with relevant information, None if every node failed
         """
-        try:
-            headers = {'Content-Type': 'application/json'}
-            payload = {
-                "jsonrpc": "2.0",
-                "method": "condenser_api.get_reward_fund",
-                "params": [fund_name],
-                "id": 1
-            }
-            
-            response = requests.post(node_url, json=payload, headers=headers, timeout=5)
-            
-            if response.status_code == 200:
-                result = response.json()
-                if 'result' in result:
-                    # Convert amounts to a more usable format
-                    reward_data = result['result']
-                    return reward_data
-                    
-            logger.warning(f"Failed to get reward fund data from {node_url}")
-            # self.switch_to_backup_node()
-            return self.get_reward_fund(fund_name)  # Try again with new node
-            
-        except Exception as e:
-            logger.error(f"Error getting reward fund: {str(e)}")
-            # self.switch_to_backup_node()
-            return self.get_reward_fund(fund_name)  # Try again with new node
-    
-    def get_current_median_history_price(self):
+        headers = {'Content-Type': 'application/json'}
+        payload = {
+            "jsonrpc": "2.0",
+            "method": "condenser_api.get_reward_fund",
+            "params": [fund_name],
+            "id": 1
+        }
+        
         for node_url in self.node_urls.get('steem'):
             if not self.ping_server(node_url):
                 logger.error(f"Impossibile raggiungere il server: {node_url}")
                 continue
+            try:
+                response = self.session.post(node_url, json=payload, headers=headers, timeout=5)
+                
+                if response.status_code == 200:
+                    result = response.json()
+                    if 'result' in result:
+                        # Convert amounts to a more usable format
+                        reward_data = result['result']
+                        return reward_data
+                
+                logger.warning(f"Failed to get reward fund data from {node_url}")
+            
+            except Exception as e:
+                logger.error(f"Error getting reward fund from {node_url}: {str(e)}")
+        
+        logger.error("Tutti i nodi sono irraggiungibili")
+        return None
+    
+    def get_current_median_history_price(self):
         """Get the current median price history from the blockchain.
         
+        Tries each node once, skipping unreachable ones.
+        
         Returns:
-            dict: Price data with base and quote values
+            dict: Price data with base and quote values, None if every node failed
         """
-        try:
-            headers = {'Content-Type': 'application/json'}
-            payload = {
-                "jsonrpc": "2.0",
-                "method": "condenser_api.get_current_median_history_price",
-                "params": [],
-                "id": 1
-            }
-            
-            response = requests.post(node_url, json=payload, headers=headers, timeout=5)
-            
-            if response.status_code == 200:
-                result = response.json()
-                if 'result' in result:
-                    # Parse price data into a usable format
-                    price_data = result['result']
-                    
-                    # Convert price strings to structured data
-                    base_parts = price_data['base'].split(' ')
-                    quote_parts = price_data['quote'].split(' ')
-                    
-                    return {
-                        'base': {
-                            'amount': float(base_parts[0]),
-                            'symbol': base_parts[1]
-                        },
-                        'quote': {
-                            'amount': float(quote_parts[0]),
-                            'symbol': quote_parts[1]
+        headers = {'Content-Type': 'application/json'}
+        payload = {
+            "jsonrpc": "2.0",
+            "method": "condenser_api.get_current_median_history_price",
+            "params": [],
+            "id": 1
+        }
+        
+        for node_url in self.node_urls.get('steem'):
+            if not self.ping_server(node_url):
+                logger.error(f"Impossibile raggiungere il server: {node_url}")
+                continue
+            try:
+                response = self.session.post(node_url, json=payload, headers=headers, timeout=5)
+                
+                if response.status_code == 200:
+                    result = response.json()
+                    if 'result' in result:
+                        # Parse price data into a usable format
+                        price_data = result['result']
+                        
+                        # Convert price strings to structured data
+                        base_parts = price_data['base'].split(' ')
+                        quote_parts = price_data['quote'].split(' ')
+                        
+                        return {
+                            'base': {
+                                'amount': float(base_parts[0]),
+                                'symbol': base_parts[1]
+                            },
+                            'quote': {
+                                'amount': float(quote_parts[0]),
+                                'symbol': quote_parts[1]
+                            }
                         }
-                    }
-                    
-            logger.warning(f"Failed to get price data from {node_url}")
-            # self.switch_to_backup_node()
-            return self.get_current_median_history_price()  # Try again with new node
+                
+                logger.warning(f"Failed to get price data from {node_url}")
             
-        except Exception as e:
-            logger.error(f"Error getting current median history price: {str(e)}")
-            # self.switch_to_backup_node()
-            return self.get_current_median_history_price()  # Try again with new node
+            except Exception as e:
+                logger.error(f"Error getting current median history price from {node_url}: {str(e)}")
+        
+        logger.error("Tutti i nodi sono irraggiungibili")
+        return None
 
 def main():
     """Main application entry point"""
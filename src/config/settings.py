@@ -4,6 +4,7 @@ Configuration settings for Steem Curator Analyzer
 """
 
 import logging
+import os
 from typing import List, Dict
 
 # Logging configuration
@@ -24,8 +25,77 @@ DEFAULT_VOTING_POWER = 9200
 DEFAULT_BATCH_SIZE = 500
 DEFAULT_TIMEOUT = 5
 
+# Node health monitoring
+NODE_PROBE_INTERVAL = 60  # Seconds between background probes of every node
+NODE_LATENCY_SMOOTHING = 0.3  # Weight of the newest sample in the latency average
+
+# HTTP connection pooling
+HTTP_POOL_SIZE = 10  # Keep-alive connections kept per node
+HTTP_MAX_RETRIES = 2  # Transport-level retries on connection errors and 502/503/504
+HTTP_RETRY_BACKOFF = 0.3
+
+# Request hedging (duplicate slow reads on the next ranked node)
+HEDGE_REQUESTS = False  # Enable hedging in the connectors
+HEDGE_LATENCY_PERCENTILE = 95  # Latency percentile of a method after which a request is hedged
+HEDGE_MIN_SAMPLES = 20  # Samples needed before the percentile is trusted
+HEDGE_SAMPLE_WINDOW = 200  # Recent latencies kept per method
+HEDGE_DEFAULT_DELAY = 1.0  # Seconds before hedging while a method has too few samples
+HEDGE_MIN_DELAY = 0.05  # Never hedge earlier than this
+HEDGE_MAX_EXTRA_REQUESTS = 1  # Hedges fired per request at most
+HEDGE_WORKERS = 8  # Threads running hedged attempts in the sync connector
+
+# Node circuit breakers and retries
+CIRCUIT_FAILURE_THRESHOLD = 3  # Consecutive failures opening a node's breaker
+CIRCUIT_BACKOFF_BASE = 2.0  # Seconds a breaker stays open after its first trip, doubled on each further trip
+CIRCUIT_BACKOFF_MAX = 120.0  # Longest a breaker stays open (and a retry waits)
+RPC_RETRY_BACKOFF = 0.5  # Base seconds of the jittered backoff before retrying a failed batch
+NODE_SWITCH_RETRIES = 3  # Retries of a failed history batch on another node
+
+# Client-side rate limiting (token bucket per node, shared by every connector and the health probes;
+# beem account lookups and connects take one token each)
+NODE_RATE_LIMIT = 8.0  # Requests per second sent to a node
+NODE_RATE_BURST = 16  # Requests that can be sent at once after a quiet period
+NODE_RATE_LIMITS = {}  # Per-node overrides: {node_url: (requests per second, burst)}
+NODE_RATE_LIMIT_PENALTY = 2.0  # Seconds a node is held back after a 429 without Retry-After
+
+# JSON-RPC batching
+RPC_BATCH_SIZE = 50  # Maximum calls packed in a single JSON-RPC batch request
+CONTENT_FETCH_WORKERS = 4  # Batches of posts fetched in parallel
+
 # Analysis parameters
 VOTE_BUFFER_DAYS = 14  # Extra days to look back for votes (rewards come ~7 days after votes)
+CHAIN_PARAMS_TTL = 300  # Seconds a chain parameters snapshot stays valid
+HISTORICAL_VESTS_CONVERSION = False  # Convert rewards at the STEEM per VESTS rate recorded locally around their time (older rewards use the first recorded rate)
+VOTING_MANA_REGENERATION_SECONDS = 5 * 24 * 60 * 60  # Time for voting mana to recharge from 0 to 100%
+VOTE_POWER_RESERVE_RATE = 10  # Full votes per day at which mana is drained (a 100% vote uses 2% of mana)
+
+# Local account history store
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data')
+HISTORY_STORE_PATH = os.path.join(DATA_DIR, 'account_history.sqlite3')
+HISTORY_OP_TYPES = ('vote', 'curation_reward')  # Operation types kept in the store
+HISTORY_PROBE_FANOUT = 8  # Indices probed per round when locating a timestamp
+HISTORY_FETCH_WORKERS = 4  # History chunks downloaded in parallel
+NODE_MAX_CONCURRENCY = 2  # In-flight history requests allowed per node
+
+# Analysis result cache
+RESULT_CACHE_TTL = 600  # Seconds a finished analysis is reused
+RESULT_CACHE_SIZE = 32  # Analyses kept in memory (least recently used are evicted)
+RESULT_CACHE_BLOCK_BUCKET = 100  # Head blocks per cache generation (~5 minutes), newer blocks start fresh entries
+RESULT_CACHE_PATH = None  # SQLite file shared by web workers, e.g. os.path.join(DATA_DIR, 'result_cache.sqlite3')
+
+# Background analysis jobs
+JOB_WORKERS = 2  # Analyses run at the same time by the web job queue
+JOB_RETENTION_SECONDS = 900  # Seconds a finished job and its result stay available
+JOB_MAX_WAIT = 30  # Longest a status request may wait for a job to finish
+
+# Streaming analysis
+STREAM_BATCH_SIZE = RPC_BATCH_SIZE  # Rows per streamed event, one enrichment batch each
+STREAM_CACHE_MAX_ROWS = 20000  # Longest streamed analysis kept for the result cache, longer ones are not cached
+
+# Data export
+EXPORT_GZIP_LEVEL = 6  # Compression level of gzipped exports (1 fastest - 9 smallest)
+EXPORT_PARQUET_COMPRESSION = 'zstd'  # Parquet codec: 'snappy', 'zstd', 'gzip' or 'none'
+EXPORT_FEATHER_COMPRESSION = 'lz4'  # Feather buffer codec: 'lz4', 'zstd' or 'uncompressed'
 
 # Table formatting
 TABLE_FORMAT = 'grid'
@@ -33,6 +103,10 @@ MAX_PERMLINK_LENGTH = 25
 
 # API endpoints
 API_ENDPOINTS = {
+    'dynamic_global_properties': 'condenser_api.get_dynamic_global_properties',
+    'accounts': 'condenser_api.get_accounts',
+    'content': 'condenser_api.get_content',
+    'account_history': 'account_history_api.get_account_history',
     'reward_fund': 'condenser_api.get_reward_fund',
     'median_price': 'condenser_api.get_current_median_history_price'
 }
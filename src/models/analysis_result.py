@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+Analysis Result
+Columnar table of a curator analysis, one NumPy array per field
+"""
+
+import sys
+from typing import Dict, Any, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from models.records import EnrichedReward
+
+
+class AnalysisResult:
+    """
+    Enriched curation rewards stored as column arrays
+    
+    Rows are ordered newest first like the list returned by the curator
+    service. Missing numeric values are NaN, rows without a matched vote
+    have has_vote False and weight 0. String columns hold interned strings
+    so repeated authors and curators share one object.
+    """
+    
+    NUMERIC_COLUMNS = (
+        'reward_vests', 'reward_sp', 'vote_value', 'voted_after_minutes',
+        'days_to_reward', 'efficiency'
+    )
+    # Columns of to_arrow, in table order
+    COLUMNS = ('timestamp', 'curator', 'author', 'permlink', 'weight', 'has_vote') + NUMERIC_COLUMNS
+    
+    def __init__(
+        self,
+        username: str,
+        days_back: int,
+        columns: Dict[str, np.ndarray]
+    ):
+        self.username = username
+        self.days_back = days_back
+        self.timestamps = columns['timestamps']
+        self.curator = columns['curator']
+        self.author = columns['author']
+        self.permlink = columns['permlink']
+        self.weight = columns['weight']
+        self.has_vote = columns['has_vote']
+        self.reward_vests = columns['reward_vests']
+        self.reward_sp = columns['reward_sp']
+        self.vote_value = columns['vote_value']
+        self.voted_after_minutes = columns['voted_after_minutes']
+        self.days_to_reward = columns['days_to_reward']
+        self.efficiency = columns['efficiency']
+    
+    @classmethod
+    def from_records(
+        cls,
+        records: Iterable[EnrichedReward],
+        username: str,
+        days_back: int
+    ) -> 'AnalysisResult':
+        """Build the column arrays from enriched reward records"""
+        records = list(records)
+        size = len(records)
+        
+        def strings(values: Iterable[Optional[str]]) -> np.ndarray:
+            column = np.empty(size, dtype=object)
+            column[:] = [sys.intern(value) if value else '' for value in values]
+            return column
+        
+        def floats(values: Iterable[Optional[float]]) -> np.ndarray:
+            return np.fromiter(
+                (np.nan if value is None else value for value in values),
+                dtype=np.float64,
+                count=size
+            )
+        
+        columns = {
+            'timestamps': np.array(
+                [
+                    np.datetime64(record.reward.timestamp, 's')
+                    if record.reward.timestamp is not None else np.datetime64('NaT')
+                    for record in records
+                ],
+                dtype='datetime64[s]'
+            ),
+            'curator': strings(record.reward.curator for record in records),
+            'author': strings(record.reward.comment_author for record in records),
+            'permlink': strings(record.reward.comment_permlink for record in records),
+            'weight': np.fromiter(
+                (record.vote.weight if record.vote else 0 for record in records),
+                dtype=np.int64,
+                count=size
+            ),
+            'has_vote': np.fromiter(
+                (record.vote is not None for record in records),
+                dtype=bool,
+                count=size
+            ),
+            'reward_vests': floats(record.reward.reward_vests for record in records),
+            'reward_sp': floats(record.reward_sp for record in records),
+            'vote_value': floats(record.vote_value_steem for record in records),
+            'voted_after_minutes': floats(record.voted_after_minutes for record in records),
+            'days_to_reward': floats(record.days_to_reward for record in records),
+            'efficiency': floats(record.efficiency for record in records)
+        }
+        return cls(username, days_back, columns)
+    
+    def __len__(self) -> int:
+        return len(self.timestamps)
+    
+    @property
+    def timestamp_strings(self) -> np.ndarray:
+        """Timestamps in the chain format, computed in one vectorized call"""
+        return np.datetime_as_string(self.timestamps, unit='s')
+    
+    @property
+    def total_operations(self) -> int:
+        """Number of curation rewards"""
+        return len(self)
+    
+    @property
+    def operations_with_votes(self) -> int:
+        """Number of rewards matched with a vote"""
+        return int(np.count_nonzero(self.has_vote))
+    
+    @property
+    def match_percentage(self) -> float:
+        """Share of rewards matched with a vote, in percent"""
+        return self.operations_with_votes / len(self) * 100 if len(self) else 0.0
+    
+    @property
+    def total_reward_sp(self) -> float:
+        """Sum of the rewards in SP"""
+        return float(np.nansum(self.reward_sp))
+    
+    @property
+    def total_vote_value(self) -> float:
+        """Sum of the estimated vote values in STEEM"""
+        return float(np.nansum(self.vote_value))
+    
+    @property
+    def average_efficiency(self) -> float:
+        """Total reward SP over total vote value, in percent"""
+        total_vote_value = self.total_vote_value
+        return self.total_reward_sp / total_vote_value * 100 if total_vote_value > 0 else 0.0
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get the summary statistics of the analysis"""
+        return {
+            'total_operations': self.total_operations,
+            'operations_with_votes': self.operations_with_votes,
+            'match_percentage': self.match_percentage,
+            'total_reward_sp': self.total_reward_sp,
+            'total_vote_value': self.total_vote_value,
+            'average_efficiency': self.average_efficiency
+        }
+    
+    def iter_rows(self, columns: Optional[List[str]] = None) -> Iterable[Dict[str, Any]]:
+        """
+        Iterate over rows as plain dicts (NaN and NaT values become None)
+        
+        Args:
+            columns: Column names to include, all columns by default
+        """
+        data = self._column_lists(columns)
+        names = list(data)
+        for values in zip(*data.values()):
+            yield dict(zip(names, values))
+    
+    def _column_lists(self, columns: Optional[List[str]] = None) -> Dict[str, list]:
+        """Convert columns to Python lists once, so rows can be zipped cheaply"""
+        data = {
+            'timestamp': lambda: [
+                timestamp if not missing else None
+                for timestamp, missing in zip(self.timestamp_strings.tolist(), np.isnat(self.timestamps).tolist())
+            ],
+            'curator': lambda: self.curator.tolist(),
+            'author': lambda: self.author.tolist(),
+            'permlink': lambda: self.permlink.tolist(),
+            'weight': lambda: [
+                weight if has_vote else None
+                for weight, has_vote in zip(self.weight.tolist(), self.has_vote.tolist())
+            ],
+            'has_vote': lambda: self.has_vote.tolist()
+        }
+        for name in self.NUMERIC_COLUMNS:
+            data[name] = lambda name=name: [
+                None if value != value else value for value in getattr(self, name).tolist()
+            ]
+        selected = columns or list(data)
+        return {name: data[name]() for name in selected}
+    
+    def to_pandas(self) -> pd.DataFrame:
+        """Convert to a pandas DataFrame without copying numeric columns"""
+        frame = pd.DataFrame({
+            'timestamp': self.timestamps,
+            'curator': pd.Categorical(self.curator),
+            'author': pd.Categorical(self.author),
+            'permlink': self.permlink,
+            'weight': self.weight,
+            'has_vote': self.has_vote,
+            **{name: getattr(self, name) for name in self.NUMERIC_COLUMNS}
+        }, copy=False)
+        return frame
+    
+    def to_arrow(self, columns: Optional[List[str]] = None) -> pa.Table:
+        """
+        Convert to an Arrow table with native types
+        
+        Timestamps are UTC seconds, curators and authors are dictionary
+        encoded, and missing values (NaN, NaT, the weight of unmatched
+        rewards) become nulls. Numeric columns are converted from the
+        arrays without going through Python objects.
+        
+        Args:
+            columns: Column names to include, all columns by default
+        """
+        arrays = {
+            'timestamp': lambda: pa.array(self.timestamps, type=pa.timestamp('s', tz='UTC'), from_pandas=True),
+            'curator': lambda: pa.array(self.curator, type=pa.string()).dictionary_encode(),
+            'author': lambda: pa.array(self.author, type=pa.string()).dictionary_encode(),
+            'permlink': lambda: pa.array(self.permlink, type=pa.string()),
+            'weight': lambda: pa.array(self.weight, mask=~self.has_vote),
+            'has_vote': lambda: pa.array(self.has_vote)
+        }
+        for name in self.NUMERIC_COLUMNS:
+            arrays[name] = lambda name=name: pa.array(getattr(self, name), from_pandas=True)
+        selected = columns or self.COLUMNS
+        return pa.table({name: arrays[name]() for name in selected})
+
+
+class AnalysisTotals:
+    """
+    Summary statistics of an analysis received in pieces
+    
+    Adds up the totals of each partial result, so streamed analyses report
+    the same statistics as AnalysisResult.get_statistics without keeping
+    the rows.
+    """
+    
+    def __init__(self):
+        self.total_operations = 0
+        self.operations_with_votes = 0
+        self.total_reward_sp = 0.0
+        self.total_vote_value = 0.0
+    
+    def add(self, result: AnalysisResult) -> None:
+        """Include a partial result"""
+        self.total_operations += result.total_operations
+        self.operations_with_votes += result.operations_with_votes
+        self.total_reward_sp += result.total_reward_sp
+        self.total_vote_value += result.total_vote_value
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get the summary statistics of the results added so far"""
+        total_operations = self.total_operations
+        total_vote_value = self.total_vote_value
+        return {
+            'total_operations': total_operations,
+            'operations_with_votes': self.operations_with_votes,
+            'match_percentage': self.operations_with_votes / total_operations * 100 if total_operations else 0.0,
+            'total_reward_sp': self.total_reward_sp,
+            'total_vote_value': total_vote_value,
+            'average_efficiency': self.total_reward_sp / total_vote_value * 100 if total_vote_value > 0 else 0.0
+        }
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+Record Types
+Compact __slots__ records for the operations flowing through the analysis.
+They keep only the fields the analysis uses (timestamps as epoch seconds,
+amounts as floats) and convert to and from the beem dict format at the
+API boundary.
+"""
+
+from typing import Dict, Any, Optional, Union
+
+from utils.assets import parse_amount
+from utils.timestamps import to_epoch, format_epoch
+
+VESTS_PRECISION = 6
+VESTS_NAI = '@@000000037'
+
+
+class VoteOp:
+    """A vote cast by the curator, with the replayed voting state if known"""
+    
+    __slots__ = (
+        'index', 'voter', 'author', 'permlink', 'weight', 'timestamp',
+        'voting_power', 'effective_vests'
+    )
+    
+    def __init__(
+        self,
+        index: int,
+        voter: str,
+        author: str,
+        permlink: str,
+        weight: int,
+        timestamp: Optional[int],
+        voting_power: Optional[float] = None,
+        effective_vests: Optional[float] = None
+    ):
+        self.index = index
+        self.voter = voter
+        self.author = author
+        self.permlink = permlink
+        self.weight = weight
+        self.timestamp = timestamp
+        self.voting_power = voting_power
+        self.effective_vests = effective_vests
+    
+    @property
+    def key(self) -> str:
+        """Post key in "author/permlink" form"""
+        return f"{self.author}/{self.permlink}"
+    
+    @classmethod
+    def from_dict(cls, op: Dict[str, Any]) -> 'VoteOp':
+        """Build a vote from a beem vote operation"""
+        return cls(
+            op.get('index'),
+            op.get('voter'),
+            op.get('author'),
+            op.get('permlink'),
+            int(op.get('weight', 0)),
+            to_epoch(op.get('timestamp')),
+            op.get('voting_power'),
+            op.get('effective_vests')
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the beem vote operation format (plus the replayed state if known)"""
+        data = {
+            'index': self.index,
+            'type': 'vote',
+            'voter': self.voter,
+            'author': self.author,
+            'permlink': self.permlink,
+            'weight': self.weight,
+            'timestamp': format_epoch(self.timestamp) if self.timestamp is not None else None
+        }
+        if self.voting_power is not None:
+            data['voting_power'] = self.voting_power
+        if self.effective_vests is not None:
+            data['effective_vests'] = self.effective_vests
+        return data
+
+
+class CurationRewardOp:
+    """A curation reward paid to the curator, reward amount in VESTS"""
+    
+    __slots__ = ('index', 'curator', 'comment_author', 'comment_permlink', 'reward_vests', 'timestamp')
+    
+    def __init__(
+        self,
+        index: int,
+        curator: str,
+        comment_author: str,
+        comment_permlink: str,
+        reward_vests: Optional[float],
+        timestamp: Optional[int]
+    ):
+        self.index = index
+        self.curator = curator
+        self.comment_author = comment_author
+        self.comment_permlink = comment_permlink
+        self.reward_vests = reward_vests
+        self.timestamp = timestamp
+    
+    @property
+    def key(self) -> str:
+        """Rewarded post key in "author/permlink" form"""
+        return f"{self.comment_author}/{self.comment_permlink}"
+    
+    @classmethod
+    def from_dict(cls, op: Dict[str, Any]) -> 'CurationRewardOp':
+        """Build a reward from a beem curation_reward operation"""
+        return cls(
+            op.get('index'),
+            op.get('curator'),
+            op.get('comment_author'),
+            op.get('comment_permlink'),
+            parse_amount(op.get('reward')),
+            to_epoch(op.get('timestamp'))
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the beem curation_reward operation format (reward as NAI)"""
+        reward = None
+        if self.reward_vests is not None:
+            reward = {
+                'amount': str(int(round(self.reward_vests * 10 ** VESTS_PRECISION))),
+                'precision': VESTS_PRECISION,
+                'nai': VESTS_NAI
+            }
+        
+        return {
+            'index': self.index,
+            'type': 'curation_reward',
+            'curator': self.curator,
+            'comment_author': self.comment_author,
+            'comment_permlink': self.comment_permlink,
+            'reward': reward,
+            'timestamp': format_epoch(self.timestamp) if self.timestamp is not None else None
+        }
+
+
+class PostRecord:
+    """The post fields used to time a vote"""
+    
+    __slots__ = ('author', 'permlink', 'created')
+    
+    def __init__(self, author: str, permlink: str, created: Optional[int]):
+        self.author = author
+        self.permlink = permlink
+        self.created = created
+    
+    @property
+    def key(self) -> str:
+        """Post key in "author/permlink" form"""
+        return f"{self.author}/{self.permlink}"
+    
+    @classmethod
+    def from_dict(cls, content: Dict[str, Any]) -> 'PostRecord':
+        """Build a post record from a get_content result"""
+        return cls(
+            content.get('author'),
+            content.get('permlink'),
+            to_epoch(content.get('created'))
+        )
+
+
+class EnrichedReward:
+    """A curation reward matched with its vote and the derived metrics"""
+    
+    __slots__ = (
+        'reward', 'vote', 'reward_sp', 'vote_value_steem',
+        'voted_after_minutes', 'days_to_reward', 'efficiency'
+    )
+    
+    def __init__(
+        self,
+        reward: CurationRewardOp,
+        vote: Optional[VoteOp] = None,
+        reward_sp: Optional[float] = None,
+        vote_value_steem: Optional[float] = None,
+        voted_after_minutes: Optional[float] = None,
+        days_to_reward: Optional[float] = None,
+        efficiency: Optional[float] = None
+    ):
+        self.reward = reward
+        self.vote = vote
+        self.reward_sp = reward_sp
+        self.vote_value_steem = vote_value_steem
+        self.voted_after_minutes = voted_after_minutes
+        self.days_to_reward = days_to_reward
+        self.efficiency = efficiency
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'EnrichedReward':
+        """Build a record from the combined operation dict"""
+        vote_info = data.get('vote_info')
+        return cls(
+            CurationRewardOp.from_dict(data),
+            VoteOp.from_dict(vote_info) if vote_info else None,
+            data.get('reward_sp'),
+            data.get('vote_value_steem'),
+            data.get('voted_after_minutes'),
+            data.get('days_to_reward'),
+            data.get('efficiency')
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert to the combined operation dict returned by the API
+        
+        Metrics are only included once computed, efficiency is always
+        present (possibly None) when a vote was matched.
+        """
+        data = self.reward.to_dict()
+        
+        if self.vote is not None:
+            data['vote_info'] = self.vote.to_dict()
+        
+        for field in ('reward_sp', 'vote_value_steem', 'voted_after_minutes', 'days_to_reward'):
+            value = getattr(self, field)
+            if value is not None:
+                data[field] = value
+        
+        if self.vote is not None:
+            data['efficiency'] = self.efficiency
+        return data
+
+
+def operation_from_dict(op: Dict[str, Any]) -> Optional[Union[VoteOp, CurationRewardOp]]:
+    """Build the record matching an operation's type, None for other types"""
+    op_type = op.get('type')
+    if op_type == 'vote':
+        return VoteOp.from_dict(op)
+    if op_type == 'curation_reward':
+        return CurationRewardOp.from_dict(op)
+    return None
@@ -0,0 +1,446 @@
+# -*- coding: utf-8 -*-
+"""
+Async Steem Network Connector
+asyncio counterpart of SteemConnector, sharing its node health ranking
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional, Dict, Any, List, Tuple
+
+import aiohttp
+
+from network.steem_connector import NodeHealthManager
+from network.hedging import HedgePolicy, PRIMARY, HEDGE, FAILOVER
+from network.circuit_breaker import backoff_delay
+from network.rate_limiter import NodeRateLimiter, get_shared_limiter, retry_after_seconds
+from config.settings import (
+    STEEM_NODES,
+    DEFAULT_TIMEOUT,
+    HTTP_POOL_SIZE,
+    NODE_MAX_CONCURRENCY,
+    RPC_BATCH_SIZE,
+    API_ENDPOINTS,
+    HEDGE_REQUESTS,
+    RPC_RETRY_BACKOFF,
+    CIRCUIT_BACKOFF_MAX
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSteemConnector:
+    """
+    Non-blocking JSON-RPC client for Steem nodes
+    
+    Every call fails over along the ranking of the health manager (which
+    can be shared with a SteemConnector) and waits for a per-node slot, so
+    any number of concurrent analyses keep at most per_node_concurrency
+    requests in flight on each node. Hedging, when enabled, works as in
+    SteemConnector and its policy can be shared as well.
+    """
+    
+    def __init__(
+        self,
+        node_urls: Optional[List[str]] = None,
+        health: Optional[NodeHealthManager] = None,
+        per_node_concurrency: int = NODE_MAX_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+        hedge: Optional[HedgePolicy] = None,
+        hedging: bool = HEDGE_REQUESTS,
+        rate_limiter: Optional[NodeRateLimiter] = None
+    ):
+        self.node_urls = node_urls or STEEM_NODES
+        self.rate_limiter = rate_limiter or get_shared_limiter()
+        self.health = health or NodeHealthManager(self.node_urls, rate_limiter=self.rate_limiter)
+        self.per_node_concurrency = per_node_concurrency
+        self.timeout = timeout
+        self.hedge = hedge or (HedgePolicy() if hedging else None)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._node_slots: Dict[str, asyncio.Semaphore] = {}
+        self._probed = False
+    
+    async def __aenter__(self) -> 'AsyncSteemConnector':
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get the keep-alive session, created on first use inside the running loop"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=HTTP_POOL_SIZE),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'Content-Type': 'application/json'}
+            )
+        return self._session
+    
+    def _get_node_slot(self, node_url: str) -> asyncio.Semaphore:
+        """Get the semaphore limiting in-flight requests on a node"""
+        slot = self._node_slots.get(node_url)
+        if slot is None:
+            slot = asyncio.Semaphore(self.per_node_concurrency)
+            self._node_slots[node_url] = slot
+        return slot
+    
+    async def close(self) -> None:
+        """Close the HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def get_ranked_nodes(self) -> List[str]:
+        """Get nodes ordered by preference (the first ranking probes in a thread)"""
+        if self._probed:
+            return self.health.get_ranked_nodes()
+        ranked = await asyncio.to_thread(self.health.get_ranked_nodes)
+        self._probed = True
+        return ranked
+    
+    async def get_working_nodes(self) -> List[str]:
+        """Get all healthy nodes ordered by latency"""
+        await self.get_ranked_nodes()
+        return self.health.get_healthy_nodes()
+    
+    async def switch_node(self, attempt: int = 1) -> bool:
+        """
+        Wait before retrying a failed request (see SteemConnector.switch_node)
+        
+        Every call already fails over along the ranking, so only the
+        backoff is needed here.
+        
+        Returns:
+            True if a node is available to retry on, False otherwise
+        """
+        delay = max(backoff_delay(attempt, RPC_RETRY_BACKOFF), self.health.retry_in())
+        if delay > CIRCUIT_BACKOFF_MAX:
+            return False
+        await asyncio.sleep(delay)
+        return bool(self.health.get_available_nodes())
+    
+    async def _get_call_order(self, node_url: Optional[str] = None) -> List[str]:
+        """Get the nodes to try in order, starting from the preferred one if given"""
+        ranked = await self.get_ranked_nodes()
+        if node_url and node_url in ranked:
+            ranked.remove(node_url)
+            ranked.insert(0, node_url)
+        return ranked
+    
+    async def _post_json_rpc(self, payload: Any, description: str, node_url: Optional[str] = None) -> Optional[Any]:
+        """
+        POST a JSON-RPC payload to the best ranked (or preferred) node
+        
+        Same failover and hedging rules as SteemConnector._post_json_rpc.
+        
+        Returns:
+            Decoded JSON response body or None if every node failed
+        """
+        return (await self._post_json_rpc_from(payload, description, node_url))[1]
+    
+    async def _post_json_rpc_from(
+        self,
+        payload: Any,
+        description: str,
+        node_url: Optional[str] = None
+    ) -> Tuple[Optional[str], Optional[Any]]:
+        """Same as _post_json_rpc, also returning the node that answered (None if none did)"""
+        call_order = await self._get_call_order(node_url)
+        key = self.hedge.method_key(payload) if self.hedge else None
+        
+        if key is not None and len(call_order) > 1:
+            answered_by, body = await self._post_hedged(payload, description, call_order, key)
+            if answered_by is not None:
+                return answered_by, body
+        else:
+            for node_url in call_order:
+                outcome, body = await self._attempt(node_url, payload, description)
+                if outcome != 'failed':
+                    return node_url, body
+        
+        logger.error("Tutti i nodi sono irraggiungibili")
+        return None, None
+    
+    async def _attempt(
+        self,
+        node_url: str,
+        payload: Any,
+        description: str,
+        sent: Optional[asyncio.Event] = None
+    ) -> Tuple[str, Optional[Any]]:
+        """
+        POST a payload to one node and report the outcome to the health manager
+        
+        Args:
+            sent: Optional event set once a node slot is acquired and the request goes out
+        
+        Returns:
+            ('ok', body), ('too_large', error body) or ('failed', None),
+            also failed without sending if the node's circuit breaker is open
+        """
+        if not self.health.allow_request(node_url):
+            return 'failed', None
+        session = self._get_session()
+        try:
+            await self.rate_limiter.acquire_async(node_url)
+            async with self._get_node_slot(node_url):
+                if sent is not None:
+                    sent.set()
+                started = time.monotonic()
+                async with session.post(node_url, json=payload) as response:
+                    if response.status == 413:
+                        self.health.release_request(node_url)
+                        return 'too_large', {'error': {'code': 413, 'message': 'Payload too large'}}
+                    
+                    if response.status == 429:
+                        # Rate limited: slow down on this node and use the next one meanwhile
+                        logger.warning(f"Rate limited on {node_url} calling {description}")
+                        self.rate_limiter.penalize(node_url, retry_after_seconds(response.headers))
+                        self.health.release_request(node_url)
+                        return 'failed', None
+                    
+                    if response.status != 200:
+                        logger.warning(f"Failed API call {description} on {node_url}: HTTP {response.status}")
+                        self.health.report_failure(node_url)
+                        return 'failed', None
+                    
+                    body = await response.json(content_type=None)
+            latency = time.monotonic() - started
+            self.health.report_success(node_url, latency)
+            if self.hedge:
+                key = self.hedge.method_key(payload)
+                if key is not None:
+                    self.hedge.record_latency(key, latency)
+            return 'ok', body
+        
+        except asyncio.CancelledError:
+            # A losing hedge: no verdict on the node
+            self.health.release_request(node_url)
+            raise
+        
+        except Exception as e:
+            logger.error(f"Error making API call {description} on {node_url}: {e}")
+            self.health.report_failure(node_url)
+            return 'failed', None
+    
+    async def _post_hedged(
+        self,
+        payload: Any,
+        description: str,
+        call_order: List[str],
+        key: str
+    ) -> Tuple[Optional[str], Optional[Any]]:
+        """
+        Send a read to the ranked nodes, hedging it when it is slow
+        
+        See SteemConnector._post_hedged. The hedge delay only starts once
+        the latest attempt holds its node slot, so waiting behind our own
+        concurrency limit doesn't trigger hedges, and losing attempts are
+        cancelled.
+        
+        Returns:
+            (answering node, body) on success, (None, None) if every node failed
+        """
+        delay = self.hedge.get_delay(key)
+        nodes = iter(call_order)
+        pending: Dict[asyncio.Task, Tuple[str, str]] = {}
+        hedges_sent = 0
+        sent = asyncio.Event()
+        
+        def launch(origin: str) -> bool:
+            nonlocal sent
+            node = next(nodes, None)
+            if node is None:
+                return False
+            sent = asyncio.Event()
+            pending[asyncio.ensure_future(self._attempt(node, payload, description, sent))] = origin, node
+            return True
+        
+        try:
+            can_hedge = launch(PRIMARY)
+            while pending:
+                can_hedge = can_hedge and hedges_sent < self.hedge.max_extra_requests
+                if can_hedge and not sent.is_set():
+                    # Still queued for a node slot: wait until it is sent or something finishes
+                    waiter = asyncio.ensure_future(sent.wait())
+                    await asyncio.wait([waiter, *pending], return_when=asyncio.FIRST_COMPLETED)
+                    waiter.cancel()
+                
+                done, _ = await asyncio.wait(
+                    list(pending),
+                    timeout=delay if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                
+                if not done:
+                    # Straggler: fire the same read at the next node
+                    can_hedge = launch(HEDGE)
+                    if can_hedge:
+                        hedges_sent += 1
+                        logger.debug(f"Hedging {description} after {delay:.3f}s")
+                    continue
+                
+                for task in done:
+                    origin, node = pending.pop(task)
+                    outcome, body = task.result()
+                    if outcome != 'failed':
+                        self.hedge.record_outcome(hedges_sent, origin)
+                        return node, body
+                
+                # Every finished attempt failed: fail over if nothing is in flight
+                if not pending:
+                    can_hedge = launch(FAILOVER)
+            
+            self.hedge.record_outcome(hedges_sent, None)
+            return None, None
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    def get_hedge_stats(self) -> Optional[Dict[str, Any]]:
+        """Get hedging statistics, None if hedging is disabled"""
+        return self.hedge.get_stats() if self.hedge else None
+    
+    async def make_api_call(
+        self,
+        method: str,
+        params: Any = None,
+        node_url: Optional[str] = None
+    ) -> Optional[Any]:
+        """Make a direct API call to Steem node (optionally preferring node_url)"""
+        response = await self.make_rpc_request(method, params, node_url)
+        if response is None:
+            return None
+        
+        if 'result' in response:
+            return response['result']
+        
+        logger.warning(f"Failed API call {method}: {response.get('error')}")
+        return None
+    
+    async def make_rpc_request(
+        self,
+        method: str,
+        params: Any = None,
+        node_url: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Make an API call and return the whole JSON-RPC response
+        
+        Returns:
+            Response object with either 'result' or 'error', None if no node answered
+        """
+        return (await self.make_rpc_request_from(method, params, node_url))[1]
+    
+    async def make_rpc_request_from(
+        self,
+        method: str,
+        params: Any = None,
+        node_url: Optional[str] = None
+    ) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Same as make_rpc_request, also returning the node that answered
+        
+        With failover or hedging this may differ from node_url, so per-node
+        facts learned from the response belong to this node.
+        """
+        payload = {
+            "jsonrpc": "2.0",
+            "method": method,
+            "params": params or [],
+            "id": 1
+        }
+        
+        answered_by, response = await self._post_json_rpc_from(payload, method, node_url)
+        if response is not None and not isinstance(response, dict):
+            return answered_by, {'error': 'Invalid response'}
+        return answered_by, response
+    
+    async def make_batch_call(
+        self,
+        calls: List[Tuple[str, Any]],
+        batch_size: int = RPC_BATCH_SIZE,
+        node_url: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Make many API calls packed into JSON-RPC batch requests
+        
+        Batches are sent concurrently. See SteemConnector.make_batch_call.
+        """
+        batches = await asyncio.gather(*(
+            self._send_batch(calls[offset:offset + batch_size], node_url)
+            for offset in range(0, len(calls), batch_size)
+        ))
+        return [response for batch in batches for response in batch]
+    
+    async def _send_batch(
+        self,
+        calls: List[Tuple[str, Any]],
+        node_url: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Send one batch, halving it if the node rejects it as a whole"""
+        if not calls:
+            return []
+        
+        payload = [
+            {
+                "jsonrpc": "2.0",
+                "method": method,
+                "params": params or [],
+                "id": index
+            }
+            for index, (method, params) in enumerate(calls)
+        ]
+        
+        body = await self._post_json_rpc(payload, f"batch of {len(calls)}", node_url)
+        if body is None:
+            return [{'error': 'All nodes failed'} for _ in calls]
+        
+        # Anything but an array or an object (a string, number...) answers no call
+        if not isinstance(body, (list, dict)):
+            logger.warning(f"Invalid response to batch of {len(calls)}: {body!r:.100}")
+            return [{'error': 'Invalid response'} for _ in calls]
+        
+        # A single object instead of an array means the whole batch was rejected
+        if not isinstance(body, list):
+            if len(calls) > 1:
+                middle = len(calls) // 2
+                logger.warning(f"Batch of {len(calls)} rejected, splitting: {body.get('error')}")
+                first, second = await asyncio.gather(
+                    self._send_batch(calls[:middle], node_url),
+                    self._send_batch(calls[middle:], node_url)
+                )
+                return first + second
+            return [{'error': body.get('error', 'Invalid response')}]
+        
+        by_id = {item.get('id'): item for item in body if isinstance(item, dict)}
+        responses = []
+        for index in range(len(calls)):
+            item = by_id.get(index)
+            if item is None:
+                responses.append({'error': 'Missing response'})
+            elif 'result' in item:
+                responses.append({'result': item['result']})
+            else:
+                responses.append({'error': item.get('error', 'Invalid response')})
+        return responses
+    
+    async def get_account(self, username: str) -> Optional[Dict[str, Any]]:
+        """Get the raw account object"""
+        accounts = await self.make_api_call(API_ENDPOINTS['accounts'], [[username]])
+        if not accounts:
+            logger.error(f"Error getting account {username}")
+            return None
+        return accounts[0]
+    
+    async def get_history_head_index(self, username: str) -> Optional[int]:
+        """Get the index of the newest operation in an account's history"""
+        result = await self.make_api_call(
+            API_ENDPOINTS['account_history'],
+            {'account': username, 'start': -1, 'limit': 1}
+        )
+        history = result.get('history') if isinstance(result, dict) else result
+        if not history:
+            return None
+        return history[-1][0]
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Circuit Breaker
+Per-node breaker (closed / open / half-open) with exponential backoff
+and jitter between trial requests
+"""
+
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from config.settings import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_BACKOFF_BASE,
+    CIRCUIT_BACKOFF_MAX
+)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+def backoff_delay(
+    attempt: int,
+    base: float = CIRCUIT_BACKOFF_BASE,
+    cap: float = CIRCUIT_BACKOFF_MAX
+) -> float:
+    """
+    Exponential backoff with jitter for the given attempt (1-based)
+    
+    Returns a random delay between half and all of ``base * 2 ** (attempt - 1)``,
+    capped, so clients failing together don't retry together.
+    """
+    delay = min(cap, base * 2 ** max(0, attempt - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a node after repeated failures
+    
+    After failure_threshold consecutive failures the breaker opens and
+    rejects requests for a backoff delay. Then it lets a single trial
+    request through (half-open): success closes it, failure opens it again
+    with a doubled delay.
+    """
+    
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        backoff_base: float = CIRCUIT_BACKOFF_BASE,
+        backoff_max: float = CIRCUIT_BACKOFF_MAX
+    ):
+        self.failure_threshold = failure_threshold
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.trips = 0
+        self.opened_until = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+    
+    def _is_available(self, now: float) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            return now >= self.opened_until
+        return not self._trial_in_flight
+    
+    def is_available(self, now: Optional[float] = None) -> bool:
+        """Whether a request would currently be allowed (without claiming it)"""
+        with self._lock:
+            return self._is_available(time.monotonic() if now is None else now)
+    
+    def retry_in(self, now: Optional[float] = None) -> float:
+        """Seconds until the breaker lets a request through, 0 if it does now"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._is_available(now):
+                return 0.0
+            return max(0.0, self.opened_until - now) if self.state == OPEN else self.backoff_base
+    
+    def allow_request(self) -> bool:
+        """Claim permission to send a request, the half-open trial included"""
+        now = time.monotonic()
+        with self._lock:
+            if not self._is_available(now):
+                return False
+            if self.state == OPEN:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN:
+                self._trial_in_flight = True
+            return True
+    
+    def release(self) -> None:
+        """Give back a claimed request that ended without a verdict (e.g. cancelled)"""
+        with self._lock:
+            self._trial_in_flight = False
+    
+    def record_success(self) -> None:
+        """Close the breaker"""
+        with self._lock:
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.trips = 0
+            self._trial_in_flight = False
+    
+    def record_failure(self) -> None:
+        """Count a failure, opening the breaker when the threshold is reached"""
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.trips += 1
+                self.state = OPEN
+                self.opened_until = time.monotonic() + backoff_delay(
+                    self.trips, self.backoff_base, self.backoff_max
+                )
+            self._trial_in_flight = False
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the breaker state"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'trips': self.trips,
+                'retry_in': round(max(0.0, self.opened_until - now), 3) if self.state == OPEN else 0.0
+            }
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+Request Hedging
+Per-method latency tracking deciding when a slow read is duplicated on
+another node, plus statistics on how often the duplicate wins
+"""
+
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import numpy as np
+
+from config.settings import (
+    HEDGE_LATENCY_PERCENTILE,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_SAMPLE_WINDOW,
+    HEDGE_DEFAULT_DELAY,
+    HEDGE_MIN_DELAY,
+    HEDGE_MAX_EXTRA_REQUESTS
+)
+
+# Read-only JSON-RPC calls, safe to send to several nodes at once
+READ_METHOD_PREFIXES = ('get_', 'find_', 'list_', 'lookup_')
+
+# Why an attempt was sent: first try, slowness hedge, or failover after failures
+PRIMARY = 'primary'
+HEDGE = 'hedge'
+FAILOVER = 'failover'
+
+
+class HedgePolicy:
+    """
+    Decides after how long a JSON-RPC request is hedged
+    
+    A request still pending after the chosen percentile of the recent
+    latencies of its method is sent again to the next ranked node and the
+    first valid answer wins. Methods without enough samples use a fixed
+    delay. Batches are tracked separately from single calls since their
+    latency grows with size.
+    """
+    
+    def __init__(
+        self,
+        percentile: float = HEDGE_LATENCY_PERCENTILE,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+        window: int = HEDGE_SAMPLE_WINDOW,
+        default_delay: float = HEDGE_DEFAULT_DELAY,
+        min_delay: float = HEDGE_MIN_DELAY,
+        max_extra_requests: int = HEDGE_MAX_EXTRA_REQUESTS
+    ):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.max_extra_requests = max_extra_requests
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._stats = {
+            'requests': 0,
+            'hedged_requests': 0,
+            'hedges_sent': 0,
+            'hedge_wins': 0,
+            'primary_wins': 0,
+            'failover_wins': 0
+        }
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def method_key(payload: Any) -> Optional[str]:
+        """
+        Get the latency key of a JSON-RPC payload, None if it can't be hedged
+        
+        Only read calls are hedged; a batch is keyed by its method when all
+        its calls share one.
+        """
+        calls = payload if isinstance(payload, list) else [payload]
+        methods = {call.get('method', '') for call in calls if isinstance(call, dict)}
+        if not methods or not all(
+            method.rsplit('.', 1)[-1].startswith(READ_METHOD_PREFIXES) for method in methods
+        ):
+            return None
+        if not isinstance(payload, list):
+            return methods.pop()
+        return f"{methods.pop()}[batch]" if len(methods) == 1 else 'batch'
+    
+    def get_delay(self, key: str) -> float:
+        """Seconds to wait for an answer before hedging a request"""
+        with self._lock:
+            samples = self._latencies.get(key)
+            if not samples or len(samples) < self.min_samples:
+                return self.default_delay
+            values = list(samples)
+        return max(self.min_delay, float(np.percentile(values, self.percentile)))
+    
+    def record_latency(self, key: str, latency: float) -> None:
+        """Record the latency of a successful attempt"""
+        with self._lock:
+            samples = self._latencies.get(key)
+            if samples is None:
+                samples = deque(maxlen=self.window)
+                self._latencies[key] = samples
+            samples.append(latency)
+    
+    def record_outcome(self, hedges_sent: int, winner: Optional[str]) -> None:
+        """
+        Record how a request ended
+        
+        Args:
+            hedges_sent: Extra requests fired because of slowness
+            winner: Origin of the attempt that gave the answer (PRIMARY,
+                HEDGE or FAILOVER), None if no attempt succeeded
+        """
+        with self._lock:
+            self._stats['requests'] += 1
+            if hedges_sent:
+                self._stats['hedged_requests'] += 1
+                self._stats['hedges_sent'] += hedges_sent
+            if winner is not None:
+                self._stats[f'{winner}_wins'] += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hedging statistics and the current delay per method"""
+        with self._lock:
+            stats = dict(self._stats)
+            keys = list(self._latencies)
+        stats['hedge_rate'] = stats['hedged_requests'] / stats['requests'] if stats['requests'] else 0.0
+        stats['hedge_win_rate'] = (
+            stats['hedge_wins'] / stats['hedged_requests'] if stats['hedged_requests'] else 0.0
+        )
+        stats['delays'] = {key: round(self.get_delay(key), 3) for key in keys}
+        return stats
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Node Rate Limiter
+Client-side token buckets pacing the requests sent to each Steem node
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from config.settings import (
+    NODE_RATE_LIMIT,
+    NODE_RATE_BURST,
+    NODE_RATE_LIMITS,
+    NODE_RATE_LIMIT_PENALTY
+)
+
+
+def retry_after_seconds(headers: Any) -> float:
+    """Seconds asked by a 429 response's Retry-After header, the default penalty otherwise"""
+    try:
+        return max(0.0, float(headers.get('Retry-After')))
+    except (TypeError, ValueError):
+        return NODE_RATE_LIMIT_PENALTY
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at rate tokens per second up to capacity
+    
+    Callers reserve a token and wait until it is theirs instead of being
+    rejected, so bursts are spread out in arrival order.
+    """
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.waits = 0
+        self.waited_seconds = 0.0
+        self._lock = threading.Lock()
+    
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens, going into debt if the bucket is empty
+        
+        Returns:
+            Seconds to wait before sending
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= tokens
+            if self.tokens >= 0:
+                return 0.0
+            delay = -self.tokens / self.rate
+            self.waits += 1
+            self.waited_seconds += delay
+            return delay
+    
+    def drain(self, seconds: float) -> None:
+        """Empty the bucket so nothing is sent for the next seconds (e.g. after a 429)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the bucket level and how much callers had to wait"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                'rate': self.rate,
+                'capacity': self.capacity,
+                'tokens': round(self.tokens, 2),
+                'waits': self.waits,
+                'waited_seconds': round(self.waited_seconds, 3)
+            }
+
+
+class NodeRateLimiter:
+    """
+    One token bucket per node, shared by sync and async connectors
+    
+    Every HTTP request to a node (a JSON-RPC batch counts as one) takes a
+    token from that node's bucket. Per-node limits come from
+    NODE_RATE_LIMITS, other nodes use NODE_RATE_LIMIT and NODE_RATE_BURST.
+    """
+    
+    def __init__(
+        self,
+        rate: float = NODE_RATE_LIMIT,
+        burst: float = NODE_RATE_BURST,
+        overrides: Optional[Dict[str, Tuple[float, float]]] = None
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.overrides = NODE_RATE_LIMITS if overrides is None else overrides
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+    
+    def _get_bucket(self, node_url: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(node_url)
+            if bucket is None:
+                rate, burst = self.overrides.get(node_url, (self.rate, self.burst))
+                bucket = TokenBucket(rate, burst)
+                self._buckets[node_url] = bucket
+            return bucket
+    
+    def acquire(self, node_url: str) -> float:
+        """Block until a request may be sent to the node, returns the time waited"""
+        delay = self._get_bucket(node_url).reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+    
+    async def acquire_async(self, node_url: str) -> float:
+        """Same as acquire without blocking the event loop"""
+        delay = self._get_bucket(node_url).reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+    
+    def penalize(self, node_url: str, seconds: float) -> None:
+        """Hold back requests to a node that asked us to slow down"""
+        self._get_bucket(node_url).drain(seconds)
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get the bucket statistics per node"""
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {url: bucket.get_stats() for url, bucket in buckets.items()}
+
+
+_shared_limiter: Optional[NodeRateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_limiter() -> NodeRateLimiter:
+    """Get the process-wide limiter, so every connector draws on the same node budgets"""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = NodeRateLimiter()
+        return _shared_limiter
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP Session Pool
+Keep-alive HTTP sessions shared by all raw JSON-RPC traffic, one per node
+"""
+
+import logging
+import threading
+import requests
+from typing import Dict, Any
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config.settings import HTTP_POOL_SIZE, HTTP_MAX_RETRIES, HTTP_RETRY_BACKOFF
+
+logger = logging.getLogger(__name__)
+
+
+class SessionPool:
+    """Manages one pooled keep-alive session per node URL"""
+    
+    def __init__(
+        self,
+        pool_size: int = HTTP_POOL_SIZE,
+        max_retries: int = HTTP_MAX_RETRIES,
+        backoff_factor: float = HTTP_RETRY_BACKOFF
+    ):
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self._sessions: Dict[str, requests.Session] = {}
+        self._request_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def _create_session(self) -> requests.Session:
+        """Create a session with a sized connection pool and retry adapter"""
+        # JSON-RPC reads are idempotent, so POST can be retried as well
+        retry = Retry(
+            total=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(['GET', 'POST']),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.pool_size,
+            max_retries=retry
+        )
+        session = requests.Session()
+        session.headers.update({'Content-Type': 'application/json'})
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+    
+    def get_session(self, url: str) -> requests.Session:
+        """Get the pooled session dedicated to a node"""
+        with self._lock:
+            session = self._sessions.get(url)
+            if session is None:
+                session = self._create_session()
+                self._sessions[url] = session
+                self._request_counts[url] = 0
+            self._request_counts[url] += 1
+            return session
+    
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request through the node's session"""
+        return self.get_session(url).get(url, **kwargs)
+    
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Send a POST request through the node's session"""
+        return self.get_session(url).post(url, **kwargs)
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get connection reuse statistics per node
+        
+        Returns:
+            Dictionary keyed by node URL with requests sent, connections
+            opened and connections currently idle in the pool
+        """
+        with self._lock:
+            sessions = dict(self._sessions)
+            counts = dict(self._request_counts)
+        
+        stats = {}
+        for url, session in sessions.items():
+            connections_opened = 0
+            idle_connections = 0
+            adapter = session.get_adapter(url)
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                connections_opened += pool.num_connections
+                if pool.pool is not None:
+                    # The pool queue is pre-filled with None placeholders
+                    idle_connections += sum(
+                        1 for conn in list(pool.pool.queue) if conn is not None
+                    )
+            
+            requests_sent = counts.get(url, 0)
+            stats[url] = {
+                'requests': requests_sent,
+                'connections_opened': connections_opened,
+                'idle_connections': idle_connections,
+                'reuse_ratio': (
+                    max(0.0, 1 - connections_opened / requests_sent) if requests_sent else 0.0
+                )
+            }
+        return stats
+    
+    def close(self) -> None:
+        """Close every session and its pooled connections"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._request_counts.clear()
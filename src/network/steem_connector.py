@@ -5,94 +5,628 @@ Handles connections to Steem blockchain nodes with failover support
 """
 
 import logging
-import requests
-from typing import Optional, Dict, Any
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Optional, Dict, Any, List, Tuple
 from beem import Steem
 from beem.account import Account
 
-from config.settings import STEEM_NODES, DEFAULT_TIMEOUT
+from network.session_pool import SessionPool
+from network.hedging import HedgePolicy, PRIMARY, HEDGE, FAILOVER
+from network.circuit_breaker import CircuitBreaker, CLOSED, backoff_delay
+from network.rate_limiter import NodeRateLimiter, get_shared_limiter, retry_after_seconds
+from config.settings import (
+    STEEM_NODES,
+    API_ENDPOINTS,
+    DEFAULT_TIMEOUT,
+    NODE_PROBE_INTERVAL,
+    NODE_LATENCY_SMOOTHING,
+    RPC_BATCH_SIZE,
+    HEDGE_REQUESTS,
+    HEDGE_WORKERS,
+    RPC_RETRY_BACKOFF,
+    CIRCUIT_BACKOFF_MAX
+)
 
 logger = logging.getLogger(__name__)
 
 
+class NodeHealthManager:
+    """
+    Probes nodes in the background and ranks the healthy ones by latency
+    
+    Probes take a token from the node's rate limiter bucket like any
+    other request.
+    """
+    
+    def __init__(
+        self,
+        node_urls: List[str],
+        sessions: Optional[SessionPool] = None,
+        probe_interval: float = NODE_PROBE_INTERVAL,
+        timeout: float = DEFAULT_TIMEOUT,
+        rate_limiter: Optional[NodeRateLimiter] = None
+    ):
+        self.node_urls = list(node_urls)
+        self.sessions = sessions or SessionPool()
+        self.rate_limiter = rate_limiter or get_shared_limiter()
+        self.probe_interval = probe_interval
+        self.timeout = timeout
+        self._stats = {
+            url: {'healthy': None, 'latency': None, 'failures': 0, 'last_probe': None}
+            for url in self.node_urls
+        }
+        self._breakers = {url: CircuitBreaker() for url in self.node_urls}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+    
+    def probe(self, url: str) -> Optional[float]:
+        """Ping a node and return its latency in seconds, None if unreachable"""
+        try:
+            self.rate_limiter.acquire(url)
+            started = time.monotonic()
+            response = self.sessions.get(url, timeout=self.timeout)
+            if response.status_code == 200:
+                return time.monotonic() - started
+        except Exception:
+            pass
+        return None
+    
+    def probe_all(self) -> None:
+        """Probe every node once and update its health"""
+        for url in self.node_urls:
+            latency = self.probe(url)
+            with self._lock:
+                stats = self._stats[url]
+                stats['last_probe'] = time.time()
+                if latency is None:
+                    stats['healthy'] = False
+                    logger.error(f"Impossibile raggiungere il server: {url}")
+                else:
+                    stats['healthy'] = True
+                    stats['failures'] = 0
+                    self._record_latency(stats, latency)
+    
+    def start(self) -> None:
+        """Start the background probing thread (no-op if already running)"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                name="steem-node-health",
+                daemon=True
+            )
+            self._thread.start()
+    
+    def stop(self) -> None:
+        """Stop the background probing thread"""
+        self._stop_event.set()
+    
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.probe_interval):
+            self.probe_all()
+    
+    def _record_latency(self, stats: Dict[str, Any], latency: float) -> None:
+        if stats['latency'] is None:
+            stats['latency'] = latency
+        else:
+            stats['latency'] = (
+                NODE_LATENCY_SMOOTHING * latency
+                + (1 - NODE_LATENCY_SMOOTHING) * stats['latency']
+            )
+    
+    def report_success(self, url: str, latency: float) -> None:
+        """Record a successful call on a node"""
+        breaker = self._breakers.get(url)
+        if breaker is not None:
+            breaker.record_success()
+        with self._lock:
+            stats = self._stats.get(url)
+            if stats is not None:
+                stats['healthy'] = True
+                stats['failures'] = 0
+                self._record_latency(stats, latency)
+    
+    def report_failure(self, url: str) -> None:
+        """
+        Record a failed call
+        
+        Failures demote the node in the ranking; once its circuit breaker
+        opens the node is unhealthy and gets no requests until the breaker
+        lets a trial request through.
+        """
+        breaker = self._breakers.get(url)
+        if breaker is None:
+            return
+        breaker.record_failure()
+        with self._lock:
+            stats = self._stats[url]
+            stats['failures'] += 1
+            if breaker.state != CLOSED:
+                stats['healthy'] = False
+    
+    def allow_request(self, url: str) -> bool:
+        """Claim permission to call a node from its circuit breaker"""
+        breaker = self._breakers.get(url)
+        return breaker.allow_request() if breaker is not None else True
+    
+    def release_request(self, url: str) -> None:
+        """Give back a request claimed with allow_request that was never completed"""
+        breaker = self._breakers.get(url)
+        if breaker is not None:
+            breaker.release()
+    
+    def retry_in(self) -> float:
+        """Seconds until at least one node accepts requests again"""
+        return min((breaker.retry_in() for breaker in self._breakers.values()), default=0.0)
+    
+    def get_ranked_nodes(self) -> List[str]:
+        """
+        Get nodes ordered by preference
+        
+        Healthy nodes come first sorted by latency, followed by the unhealthy
+        ones as a last resort and by those whose circuit breaker is open.
+        The first call probes all nodes synchronously.
+        """
+        with self._lock:
+            never_probed = all(s['healthy'] is None for s in self._stats.values())
+        if never_probed:
+            self.probe_all()
+            self.start()
+        
+        with self._lock:
+            def score(url):
+                stats = self._stats[url]
+                latency = stats['latency'] if stats['latency'] is not None else self.timeout
+                return latency * (1 + stats['failures'])
+            
+            available = {url for url in self.node_urls if self._breakers[url].is_available()}
+            healthy = [url for url in available if self._stats[url]['healthy']]
+            unhealthy = [url for url in available if not self._stats[url]['healthy']]
+            rejecting = [url for url in self.node_urls if url not in available]
+            return sorted(healthy, key=score) + sorted(unhealthy, key=score) + sorted(rejecting, key=score)
+    
+    def get_healthy_nodes(self) -> List[str]:
+        """Get the currently healthy nodes ordered by latency"""
+        ranked = self.get_ranked_nodes()
+        with self._lock:
+            return [
+                url for url in ranked
+                if self._stats[url]['healthy'] and self._breakers[url].is_available()
+            ]
+    
+    def get_available_nodes(self) -> List[str]:
+        """Get the nodes whose circuit breaker accepts requests, in ranking order"""
+        return [url for url in self.get_ranked_nodes() if self._breakers[url].is_available()]
+    
+    def get_best_node(self) -> Optional[str]:
+        """Get the healthy node with the lowest latency"""
+        healthy = self.get_healthy_nodes()
+        return healthy[0] if healthy else None
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get a copy of the per-node health statistics"""
+        with self._lock:
+            stats = {url: dict(node_stats) for url, node_stats in self._stats.items()}
+        for url, breaker in self._breakers.items():
+            stats[url]['circuit'] = breaker.get_stats()
+        return stats
+
+
 class SteemConnector:
     """Manages connections to Steem blockchain nodes"""
     
-    def __init__(self, node_urls: Optional[list] = None):
+    def __init__(
+        self, 
+        node_urls: Optional[list] = None, 
+        hedging: bool = HEDGE_REQUESTS,
+        rate_limiter: Optional[NodeRateLimiter] = None
+    ):
         self.node_urls = node_urls or STEEM_NODES
         self.current_node = None
         self.steem_instance = None
+        self.sessions = SessionPool()
+        self.rate_limiter = rate_limiter or get_shared_limiter()
+        self.health = NodeHealthManager(self.node_urls, self.sessions, rate_limiter=self.rate_limiter)
+        self.hedge = HedgePolicy() if hedging else None
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        self._hedge_lock = threading.Lock()
     
     def ping_server(self, url: str) -> bool:
         """Test if server is reachable"""
         try:
-            response = requests.get(url, timeout=DEFAULT_TIMEOUT)
+            self.rate_limiter.acquire(url)
+            response = self.sessions.get(url, timeout=DEFAULT_TIMEOUT)
             return response.status_code == 200
         except Exception:
             return False
     
     def get_working_node(self) -> Optional[str]:
-        """Find the first working node"""
-        for node_url in self.node_urls:
-            if self.ping_server(node_url):
-                return node_url
-            logger.error(f"Impossibile raggiungere il server: {node_url}")
-        return None
+        """Get the best healthy node as ranked by the health manager"""
+        return self.health.get_best_node()
+    
+    def get_working_nodes(self) -> List[str]:
+        """Get all healthy nodes ordered by latency"""
+        return self.health.get_healthy_nodes()
     
     def get_steem_instance(self) -> Optional[Steem]:
         """Get a working Steem instance"""
         if self.steem_instance and self.current_node:
             return self.steem_instance
-            
+        
         working_node = self.get_working_node()
         if working_node:
             self.current_node = working_node
+            # beem reads the node's config while connecting
+            self.rate_limiter.acquire(working_node)
             self.steem_instance = Steem(node=working_node)
             return self.steem_instance
         
         logger.error("Tutti i nodi sono irraggiungibili")
         return None
     
+    def switch_node(self, attempt: int = 1) -> bool:
+        """
+        Move to the best available node after a failed request
+        
+        Waits an exponential backoff with jitter for the given retry attempt,
+        longer if every node's circuit breaker is open, then points the beem
+        instance at the best node other than the current one when possible.
+        
+        Returns:
+            True if a node is available to retry on, False otherwise
+        """
+        delay = max(backoff_delay(attempt, RPC_RETRY_BACKOFF), self.health.retry_in())
+        if delay > CIRCUIT_BACKOFF_MAX:
+            return False
+        time.sleep(delay)
+        
+        nodes = self.health.get_available_nodes()
+        if not nodes:
+            return False
+        
+        others = [url for url in nodes if url != self.current_node]
+        node_url = (others or nodes)[0]
+        if node_url != self.current_node:
+            try:
+                self.rate_limiter.acquire(node_url)
+                self.steem_instance = Steem(node=node_url)
+            except Exception as e:
+                logger.error(f"Impossibile raggiungere il server: {node_url} ({e})")
+                self.health.report_failure(node_url)
+                return False
+            logger.info(f"Cambio nodo: {self.current_node} -> {node_url}")
+            self.current_node = node_url
+        return True
+    
+    def get_pool_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get HTTP connection pool statistics per node"""
+        return self.sessions.get_stats()
+    
+    def get_rate_limit_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get client-side rate limiting statistics per node"""
+        return self.rate_limiter.get_stats()
+    
     def get_account(self, username: str) -> Optional[Account]:
         """Get account information"""
         steem = self.get_steem_instance()
         if steem:
             try:
+                # beem talks to the node directly, so take its token here
+                self.rate_limiter.acquire(self.current_node)
                 return Account(username, blockchain_instance=steem)
             except Exception as e:
                 logger.error(f"Error getting account {username}: {e}")
         return None
     
-    def make_api_call(self, method: str, params: list = None) -> Optional[Dict[Any, Any]]:
-        """Make a direct API call to Steem node"""
-        working_node = self.get_working_node()
-        if not working_node:
+    def get_history_head_index(self, username: str) -> Optional[int]:
+        """Get the index of the newest operation in an account's history"""
+        result = self.make_api_call(
+            API_ENDPOINTS['account_history'],
+            {'account': username, 'start': -1, 'limit': 1}
+        )
+        history = result.get('history') if isinstance(result, dict) else result
+        if not history:
             return None
-            
+        return history[-1][0]
+    
+    def _get_call_order(self, node_url: Optional[str] = None) -> List[str]:
+        """Get the nodes to try in order, starting from the preferred one if given"""
+        ranked = self.health.get_ranked_nodes()
+        if node_url and node_url in ranked:
+            ranked.remove(node_url)
+            ranked.insert(0, node_url)
+        return ranked
+    
+    def _post_json_rpc(self, payload: Any, description: str, node_url: Optional[str] = None) -> Optional[Any]:
+        """
+        POST a JSON-RPC payload to the best ranked (or preferred) node
+        
+        Fails over to the next node only on transport errors or bad HTTP
+        responses. A 413 (payload too large) is returned as a JSON-RPC error
+        since every node would reject the same payload. With hedging enabled,
+        slow reads are also sent to the next node (see HedgePolicy).
+        
+        Returns:
+            Decoded JSON response body or None if every node failed
+        """
+        return self._post_json_rpc_from(payload, description, node_url)[1]
+    
+    def _post_json_rpc_from(
+        self, 
+        payload: Any, 
+        description: str, 
+        node_url: Optional[str] = None
+    ) -> Tuple[Optional[str], Optional[Any]]:
+        """Same as _post_json_rpc, also returning the node that answered (None if none did)"""
+        call_order = self._get_call_order(node_url)
+        key = self.hedge.method_key(payload) if self.hedge else None
+        
+        if key is not None and len(call_order) > 1:
+            answered_by, body = self._post_hedged(payload, description, call_order, key)
+            if answered_by is not None:
+                return answered_by, body
+        else:
+            for node_url in call_order:
+                outcome, body = self._attempt(node_url, payload, description)
+                if outcome != 'failed':
+                    return node_url, body
+        
+        logger.error("Tutti i nodi sono irraggiungibili")
+        return None, None
+    
+    def _attempt(self, node_url: str, payload: Any, description: str) -> Tuple[str, Optional[Any]]:
+        """
+        POST a payload to one node and report the outcome to the health manager
+        
+        Returns:
+            ('ok', body), ('too_large', error body) or ('failed', None),
+            also failed without sending if the node's circuit breaker is open
+        """
+        if not self.health.allow_request(node_url):
+            return 'failed', None
         try:
-            headers = {'Content-Type': 'application/json'}
-            payload = {
-                "jsonrpc": "2.0",
-                "method": method,
-                "params": params or [],
-                "id": 1
-            }
-            
-            response = requests.post(
-                working_node, 
-                json=payload, 
-                headers=headers, 
+            self.rate_limiter.acquire(node_url)
+            started = time.monotonic()
+            response = self.sessions.post(
+                node_url,
+                json=payload,
                 timeout=DEFAULT_TIMEOUT
             )
             
-            if response.status_code == 200:
-                result = response.json()
-                if 'result' in result:
-                    return result['result']
-                    
-            logger.warning(f"Failed API call {method} on {working_node}")
-            return None
+            if response.status_code == 413:
+                self.health.release_request(node_url)
+                return 'too_large', {'error': {'code': 413, 'message': 'Payload too large'}}
+            
+            if response.status_code == 429:
+                # Rate limited: slow down on this node and use the next one meanwhile
+                logger.warning(f"Rate limited on {node_url} calling {description}")
+                self.rate_limiter.penalize(node_url, retry_after_seconds(response.headers))
+                self.health.release_request(node_url)
+                return 'failed', None
+            
+            if response.status_code != 200:
+                logger.warning(f"Failed API call {description} on {node_url}: HTTP {response.status_code}")
+                self.health.report_failure(node_url)
+                return 'failed', None
             
+            body = response.json()
+            latency = time.monotonic() - started
+            self.health.report_success(node_url, latency)
+            if self.hedge:
+                key = self.hedge.method_key(payload)
+                if key is not None:
+                    self.hedge.record_latency(key, latency)
+            return 'ok', body
+        
         except Exception as e:
-            logger.error(f"Error making API call {method}: {e}")
+            logger.error(f"Error making API call {description} on {node_url}: {e}")
+            self.health.report_failure(node_url)
+            return 'failed', None
+    
+    def _post_hedged(
+        self, 
+        payload: Any, 
+        description: str, 
+        call_order: List[str], 
+        key: str
+    ) -> Tuple[Optional[str], Optional[Any]]:
+        """
+        Send a read to the ranked nodes, hedging it when it is slow
+        
+        The first attempt goes to the best node. Whenever no answer arrived
+        within the method's hedge delay, the same payload is fired at the
+        next node (up to max_extra_requests times); a failed attempt fails
+        over immediately. The first valid answer wins, the slower attempts
+        finish in the background and only update the node statistics.
+        
+        Returns:
+            (answering node, body) on success, (None, None) if every node failed
+        """
+        executor = self._get_hedge_executor()
+        delay = self.hedge.get_delay(key)
+        nodes = iter(call_order)
+        pending: Dict[Future, Tuple[str, str]] = {}
+        hedges_sent = 0
+        
+        def launch(origin: str) -> bool:
+            node = next(nodes, None)
+            if node is None:
+                return False
+            pending[executor.submit(self._attempt, node, payload, description)] = origin, node
+            return True
+        
+        can_hedge = launch(PRIMARY)
+        while pending:
+            can_hedge = can_hedge and hedges_sent < self.hedge.max_extra_requests
+            done, _ = wait(list(pending), timeout=delay if can_hedge else None, return_when=FIRST_COMPLETED)
+            
+            if not done:
+                # Straggler: fire the same read at the next node
+                can_hedge = launch(HEDGE)
+                if can_hedge:
+                    hedges_sent += 1
+                    logger.debug(f"Hedging {description} after {delay:.3f}s")
+                continue
+            
+            for future in done:
+                origin, node = pending.pop(future)
+                outcome, body = future.result()
+                if outcome != 'failed':
+                    self.hedge.record_outcome(hedges_sent, origin)
+                    return node, body
+            
+            # Every finished attempt failed: fail over if nothing is in flight
+            if not pending:
+                can_hedge = launch(FAILOVER)
+        
+        self.hedge.record_outcome(hedges_sent, None)
+        return None, None
+    
+    def _get_hedge_executor(self) -> ThreadPoolExecutor:
+        """Get the thread pool running hedged attempts, created on first use"""
+        with self._hedge_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(
+                    max_workers=HEDGE_WORKERS, 
+                    thread_name_prefix='rpc-hedge'
+                )
+            return self._hedge_executor
+    
+    def get_hedge_stats(self) -> Optional[Dict[str, Any]]:
+        """Get hedging statistics, None if hedging is disabled"""
+        return self.hedge.get_stats() if self.hedge else None
+    
+    def make_api_call(
+        self, 
+        method: str, 
+        params: Any = None, 
+        node_url: Optional[str] = None
+    ) -> Optional[Dict[Any, Any]]:
+        """Make a direct API call to Steem node (optionally preferring node_url)"""
+        response = self.make_rpc_request(method, params, node_url)
+        if response is None:
             return None
+        
+        if 'result' in response:
+            return response['result']
+        
+        logger.warning(f"Failed API call {method}: {response.get('error')}")
+        return None
+    
+    def make_rpc_request(
+        self, 
+        method: str, 
+        params: Any = None, 
+        node_url: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Make an API call and return the whole JSON-RPC response
+        
+        Returns:
+            Response object with either 'result' or 'error' (so callers can
+            tell node-side errors apart), None if no node answered
+        """
+        return self.make_rpc_request_from(method, params, node_url)[1]
+    
+    def make_rpc_request_from(
+        self, 
+        method: str, 
+        params: Any = None, 
+        node_url: Optional[str] = None
+    ) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Same as make_rpc_request, also returning the node that answered
+        
+        With failover or hedging this may differ from node_url, so per-node
+        facts learned from the response belong to this node.
+        """
+        payload = {
+            "jsonrpc": "2.0",
+            "method": method,
+            "params": params or [],
+            "id": 1
+        }
+        
+        answered_by, response = self._post_json_rpc_from(payload, method, node_url)
+        if response is not None and not isinstance(response, dict):
+            return answered_by, {'error': 'Invalid response'}
+        return answered_by, response
+    
+    def make_batch_call(
+        self, 
+        calls: List[Tuple[str, Any]], 
+        batch_size: int = RPC_BATCH_SIZE,
+        node_url: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Make many API calls packed into JSON-RPC batch requests
+        
+        Args:
+            calls: List of (method, params) tuples
+            batch_size: Maximum calls per HTTP request, larger lists are split
+            node_url: Optional node to try first
+            
+        Returns:
+            List aligned with calls, each entry is either {'result': ...}
+            or {'error': ...}
+        """
+        responses = []
+        for offset in range(0, len(calls), batch_size):
+            responses.extend(self._send_batch(calls[offset:offset + batch_size], node_url))
+        return responses
+    
+    def _send_batch(
+        self, 
+        calls: List[Tuple[str, Any]], 
+        node_url: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Send one batch, halving it if the node rejects it as a whole"""
+        if not calls:
+            return []
+        
+        payload = [
+            {
+                "jsonrpc": "2.0",
+                "method": method,
+                "params": params or [],
+                "id": index
+            }
+            for index, (method, params) in enumerate(calls)
+        ]
+        
+        body = self._post_json_rpc(payload, f"batch of {len(calls)}", node_url)
+        if body is None:
+            return [{'error': 'All nodes failed'} for _ in calls]
+        
+        # Anything but an array or an object (a string, number...) answers no call
+        if not isinstance(body, (list, dict)):
+            logger.warning(f"Invalid response to batch of {len(calls)}: {body!r:.100}")
+            return [{'error': 'Invalid response'} for _ in calls]
+        
+        # A single object instead of an array means the whole batch was rejected
+        if not isinstance(body, list):
+            if len(calls) > 1:
+                middle = len(calls) // 2
+                logger.warning(f"Batch of {len(calls)} rejected, splitting: {body.get('error')}")
+                return (
+                    self._send_batch(calls[:middle], node_url)
+                    + self._send_batch(calls[middle:], node_url)
+                )
+            return [{'error': body.get('error', 'Invalid response')}]
+        
+        by_id = {item.get('id'): item for item in body if isinstance(item, dict)}
+        responses = []
+        for index in range(len(calls)):
+            item = by_id.get(index)
+            if item is None:
+                responses.append({'error': 'Missing response'})
+            elif 'result' in item:
+                responses.append({'result': item['result']})
+            else:
+                responses.append({'error': item.get('error', 'Invalid response')})
+        return responses
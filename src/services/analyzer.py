@@ -5,13 +5,23 @@ Main class that coordinates all services for curator analysis
 """
 
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 
 from network.steem_connector import SteemConnector
+from services import pipeline
 from services.curator_service import CuratorService
-from services.vote_calculator import VoteCalculator
+from models.analysis_result import AnalysisResult
+from models.records import EnrichedReward
+from storage.result_cache import ResultCache
 from utils.formatters import ResultFormatter
-from config.settings import DEFAULT_USERNAME, DEFAULT_DAYS_BACK, STEEM_NODES
+from config.settings import (
+    DEFAULT_USERNAME,
+    DEFAULT_DAYS_BACK,
+    STEEM_NODES,
+    RESULT_CACHE_BLOCK_BUCKET,
+    STREAM_BATCH_SIZE,
+    STREAM_CACHE_MAX_ROWS
+)
 
 logger = logging.getLogger(__name__)
 
@@ -19,11 +29,12 @@ logger = logging.getLogger(__name__)
 class CuratorAnalyzer:
     """Main analyzer class that coordinates all services"""
     
-    def __init__(self, node_urls: Optional[List[str]] = None):
+    def __init__(self, node_urls: Optional[List[str]] = None, result_cache: Optional[ResultCache] = None):
         self.node_urls = node_urls or STEEM_NODES
         self.connector = SteemConnector(self.node_urls)
         self.curator_service = CuratorService(self.connector)
-        self.vote_calculator = VoteCalculator(self.connector)
+        self.vote_calculator = self.curator_service.vote_calculator
+        self.result_cache = result_cache or ResultCache()
         self.formatter = ResultFormatter()
     
     def analyze_curator(self, username: str = DEFAULT_USERNAME, days_back: int = DEFAULT_DAYS_BACK) -> None:
@@ -36,8 +47,8 @@ class CuratorAnalyzer:
         """
         self.formatter.display_analysis_header(username, days_back, self.node_urls)
         
-        results = self.curator_service.get_user_votes_by_days_back(username, days_back)
-        self.formatter.format_results(results, username)
+        result = self.get_curator_result(username, days_back)
+        self.formatter.format_results(result, username)
     
     def get_curator_data(self, username: str, days_back: int = DEFAULT_DAYS_BACK) -> List[Dict[str, Any]]:
         """
@@ -50,7 +61,117 @@ class CuratorAnalyzer:
         Returns:
             List of curator operations data
         """
-        return self.curator_service.get_user_votes_by_days_back(username, days_back)
+        return [record.to_dict() for record in self._get_records(username, days_back)]
+    
+    def get_curator_result(
+        self, 
+        username: str, 
+        days_back: int = DEFAULT_DAYS_BACK, 
+        progress: Optional[Dict[str, Any]] = None
+    ) -> AnalysisResult:
+        """
+        Get curator data as a columnar result table
+        
+        Args:
+            username: Username of the curator to analyze
+            days_back: Number of days to look back for analysis
+            progress: Optional dict updated in place with the analysis stage
+                and counters (see CuratorService.iter_user_votes_by_days_back)
+            
+        Returns:
+            Analysis result with one array per field, newest first
+        """
+        return AnalysisResult.from_records(self._get_records(username, days_back, progress), username, days_back)
+    
+    def _get_records(
+        self, 
+        username: str, 
+        days_back: int, 
+        progress: Optional[Dict[str, Any]] = None
+    ) -> List[EnrichedReward]:
+        """
+        Get the enriched records of an analysis, newest first, from the cache if possible
+        
+        Results are cached per (username, days_back, head block bucket), so
+        a new entry is computed once the chain has moved on by
+        RESULT_CACHE_BLOCK_BUCKET blocks. Empty results are not cached.
+        """
+        key = self._cache_key(username, days_back)
+        records = self._get_cached(key, progress)
+        if records is not None:
+            return records
+        
+        records = list(self.curator_service.iter_user_votes_by_days_back(username, days_back, progress))
+        records.reverse()
+        if key is not None and records:
+            self.result_cache.set(key, records)
+        return records
+    
+    def iter_curator_results(
+        self, 
+        username: str, 
+        days_back: int = DEFAULT_DAYS_BACK, 
+        progress: Optional[Dict[str, Any]] = None, 
+        batch_size: int = STREAM_BATCH_SIZE,
+        cache: bool = True
+    ) -> Iterator[AnalysisResult]:
+        """
+        Stream an analysis as small result tables while it is computed
+        
+        Tables come oldest first and hold up to batch_size rows each, newest
+        first, so prepending every table rebuilds the full newest-first
+        listing. A cached analysis is replayed the same way; a computed one
+        is cached once it has been streamed completely.
+        
+        Caching keeps every streamed record in memory until the end, so it
+        is skipped with cache=False and given up for analyses longer than
+        STREAM_CACHE_MAX_ROWS rows.
+        
+        Args:
+            username: Username of the curator to analyze
+            days_back: Number of days to look back for analysis
+            progress: Optional dict updated in place with the analysis stage
+                and counters
+            batch_size: Maximum rows per table
+            cache: Whether to cache a computed analysis
+        """
+        key = self._cache_key(username, days_back)
+        cached = self._get_cached(key, progress)
+        if cached is not None:
+            records = reversed(cached)
+        else:
+            records = self.curator_service.iter_user_votes_by_days_back(username, days_back, progress)
+        
+        # Records are only collected for the cache, and only up to the cap
+        collected = [] if cache and cached is None and key is not None else None
+        for batch in pipeline.batch_stage(records, batch_size):
+            if collected is not None:
+                collected.extend(batch)
+                if len(collected) > STREAM_CACHE_MAX_ROWS:
+                    logger.info(f"Analisi di {username} troppo lunga per la cache ({len(collected)}+ righe)")
+                    collected = None
+            batch.reverse()
+            yield AnalysisResult.from_records(batch, username, days_back)
+        
+        if collected:
+            collected.reverse()
+            self.result_cache.set(key, collected)
+    
+    def _get_cached(self, key: Optional[str], progress: Optional[Dict[str, Any]] = None) -> Optional[List[EnrichedReward]]:
+        """Look an analysis up in the result cache, marking progress as cached on a hit"""
+        if key is None:
+            return None
+        records = self.result_cache.get(key)
+        if records is not None and progress is not None:
+            progress['stage'] = 'cached'
+        return records
+    
+    def _cache_key(self, username: str, days_back: int) -> Optional[str]:
+        """Cache key of an analysis, None if the head block is unknown"""
+        snapshot = self.vote_calculator.get_chain_params()
+        if snapshot is None or snapshot.head_block_number is None:
+            return None
+        return ResultCache.make_key(username, days_back, snapshot.head_block_number // RESULT_CACHE_BLOCK_BUCKET)
     
     def calculate_vote_value(
         self, 
@@ -82,8 +203,24 @@ class CuratorAnalyzer:
     
     def get_working_nodes(self) -> List[str]:
         """Get list of currently working nodes"""
-        working_nodes = []
-        for node in self.node_urls:
-            if self.connector.ping_server(node):
-                working_nodes.append(node)
-        return working_nodes
+        return self.connector.get_working_nodes()
+    
+    def get_pool_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get HTTP connection pool statistics per node"""
+        return self.connector.get_pool_stats()
+    
+    def get_history_stats(self) -> Dict[str, Any]:
+        """Get account history fetching and filtering statistics"""
+        return self.curator_service.history_fetcher.get_stats()
+    
+    def get_rate_limit_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get client-side rate limiting statistics per node"""
+        return self.connector.get_rate_limit_stats()
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get analysis result cache statistics"""
+        return self.result_cache.get_stats()
+    
+    def get_hedge_stats(self) -> Optional[Dict[str, Any]]:
+        """Get request hedging statistics, None if hedging is disabled"""
+        return self.connector.get_hedge_stats()
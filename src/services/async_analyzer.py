@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+Async Curator Analyzer
+Runs curator analyses concurrently over a single AsyncSteemConnector
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone, timedelta
+from functools import partial
+from typing import List, Dict, Any, Optional
+
+from network.async_connector import AsyncSteemConnector
+from network.steem_connector import NodeHealthManager
+from services import pipeline
+from services.chain_params import ChainParamsSnapshot
+from services.content_fetcher import ContentFetcher
+from services.history_locator import HistoryLocator
+from services.history_fetcher import HistoryRangeFetcher
+from services.history_sync import HistorySync, run_steps_async, sum_rewards_since
+from services.vests_converter import VestsConverter
+from services.vote_calculator import VoteCalculator
+from services.voting_power import VotingPowerReplay
+from models.records import EnrichedReward
+from models.analysis_result import AnalysisResult
+from storage.history_store import HistoryStore
+from utils.timestamps import to_epoch, format_timestamp
+from config.settings import (
+    STEEM_NODES,
+    DEFAULT_DAYS_BACK,
+    VOTE_BUFFER_DAYS,
+    HISTORY_OP_TYPES,
+    RPC_BATCH_SIZE,
+    NODE_MAX_CONCURRENCY,
+    MESSAGES
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCuratorAnalyzer:
+    """
+    asyncio counterpart of CuratorAnalyzer for analysing many curators at once
+    
+    Network calls go through the ``*_async`` methods of the same services
+    the sync analyzer uses, so parsing, pipeline stages and the history sync
+    logic are shared. Blocking local history store calls run in worker
+    threads (asyncio.to_thread, Python 3.9+).
+    """
+    
+    def __init__(
+        self,
+        node_urls: Optional[List[str]] = None,
+        history_store: Optional[HistoryStore] = None,
+        health: Optional[NodeHealthManager] = None,
+        per_node_concurrency: int = NODE_MAX_CONCURRENCY
+    ):
+        self.node_urls = node_urls or STEEM_NODES
+        self.connector = AsyncSteemConnector(self.node_urls, health, per_node_concurrency)
+        self.vote_calculator = VoteCalculator(self.connector)
+        self.content_fetcher = ContentFetcher(self.connector)
+        self.history_locator = HistoryLocator(self.connector)
+        self.history_fetcher = HistoryRangeFetcher(self.connector)
+        self.history_store = history_store or HistoryStore()
+        self.history_sync = HistorySync(self.history_fetcher.chunk_size * self.history_fetcher.max_workers)
+        self.vests_converter = VestsConverter(self.history_store)
+    
+    async def __aenter__(self) -> 'AsyncCuratorAnalyzer':
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+    
+    async def close(self) -> None:
+        """Close the connector's HTTP session"""
+        await self.connector.close()
+    
+    async def get_curator_data(self, username: str, days_back: int = DEFAULT_DAYS_BACK) -> List[Dict[str, Any]]:
+        """
+        Get curator data without displaying it
+        
+        Returns:
+            List of combined operations with reward and vote data, newest first
+        """
+        records = await self.get_user_votes(username, days_back)
+        results = [record.to_dict() for record in records]
+        results.reverse()
+        return results
+    
+    async def get_curator_result(self, username: str, days_back: int = DEFAULT_DAYS_BACK) -> AnalysisResult:
+        """
+        Get curator data as a columnar result table
+        
+        Returns:
+            Analysis result with one array per field, newest first
+        """
+        records = await self.get_user_votes(username, days_back)
+        records.reverse()
+        return AnalysisResult.from_records(records, username, days_back)
+    
+    async def analyze_many(
+        self,
+        usernames: List[str],
+        days_back: int = DEFAULT_DAYS_BACK,
+        max_concurrency: int = 4
+    ) -> Dict[str, Optional[AnalysisResult]]:
+        """
+        Analyze several curators concurrently
+        
+        Args:
+            usernames: Curators to analyze
+            days_back: Number of days to look back for each of them
+            max_concurrency: Maximum number of analyses running at once
+        
+        Returns:
+            Result per username, None for analyses that failed
+        """
+        slots = asyncio.Semaphore(max_concurrency)
+        
+        async def analyze(username: str) -> Optional[AnalysisResult]:
+            async with slots:
+                try:
+                    return await self.get_curator_result(username, days_back)
+                except Exception as e:
+                    logger.error(f"Error analyzing curator {username}: {e}")
+                    return None
+        
+        results = await asyncio.gather(*(analyze(username) for username in usernames))
+        return dict(zip(usernames, results))
+    
+    async def get_user_votes(self, username: str, days_back: int = DEFAULT_DAYS_BACK) -> List[EnrichedReward]:
+        """
+        Get curation rewards with corresponding vote information
+        
+        Same steps as CuratorService.iter_user_votes_by_days_back.
+        
+        Returns:
+            Enriched reward records, oldest first
+        """
+        head_index = await self.connector.get_history_head_index(username)
+        if head_index is None:
+            logger.error(MESSAGES['it']['all_nodes_failed'])
+            return []
+        
+        # Calculate date ranges
+        reward_cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_back)
+        vote_cutoff_date = reward_cutoff_date - timedelta(days=VOTE_BUFFER_DAYS)
+        
+        # Bring the local history store up to date, then answer from it
+        await self._sync_history(username, head_index, vote_cutoff_date)
+        
+        # Fetch chain parameters once for the whole run
+        snapshot = await self.vote_calculator.chain_params.get_snapshot_async(username)
+        if snapshot:
+            await asyncio.to_thread(self.vests_converter.record, snapshot)
+        
+        since = format_timestamp(vote_cutoff_date)
+        replay = VotingPowerReplay(
+            snapshot.effective_vests if snapshot else None,
+            await asyncio.to_thread(sum_rewards_since, self.history_store, username, since)
+        )
+        
+        # Reading the stored history is blocking, so the stages up to matching run in a thread
+        pairs = await asyncio.to_thread(self._match_stored, username, since, replay, reward_cutoff_date)
+        
+        records = []
+        for batch in pipeline.batch_stage(pairs, RPC_BATCH_SIZE):
+            records.extend(await self._enrich_batch(batch, username, snapshot))
+        return records
+    
+    def _match_stored(
+        self,
+        username: str,
+        since: str,
+        replay: VotingPowerReplay,
+        reward_cutoff_date: datetime
+    ) -> List[pipeline.RewardVotePair]:
+        """Run the stored history through the pipeline up to reward/vote matching"""
+        operations = pipeline.fetch_stage(self.history_store, username, since, HISTORY_OP_TYPES)
+        parsed = pipeline.parse_stage(operations)
+        replayed = pipeline.replay_stage(parsed, username, replay)
+        relevant = pipeline.filter_stage(replayed, username, to_epoch(reward_cutoff_date))
+        return list(pipeline.match_stage(relevant, VOTE_BUFFER_DAYS * 86400))
+    
+    async def _enrich_batch(
+        self,
+        pairs: List[pipeline.RewardVotePair],
+        username: str,
+        snapshot: Optional[ChainParamsSnapshot]
+    ) -> List[EnrichedReward]:
+        """Combine a batch of curation rewards with their matching vote information"""
+        posts = await self.content_fetcher.fetch_async([reward.key for reward, vote in pairs if vote])
+        
+        calculate_vote_values = partial(self.vote_calculator.calculate_vote_values, username)
+        if snapshot is None:
+            # Without a snapshot the calculator would fall back to a blocking fetch
+            calculate_vote_values = self._no_vote_values
+        
+        return pipeline.enrich_pairs(pairs, posts, snapshot, self.vests_converter, calculate_vote_values)
+    
+    @staticmethod
+    def _no_vote_values(*args, **kwargs) -> None:
+        return None
+    
+    async def _sync_history(self, username: str, head_index: int, vote_cutoff_date: datetime) -> None:
+        """
+        Download the operations missing from the local history store (see HistorySync.sync)
+        
+        Store calls are blocking SQLite work and run in worker threads.
+        """
+        store = self.history_store
+        await run_steps_async(self.history_sync.sync(username, head_index, vote_cutoff_date), {
+            'get_sync_state': partial(asyncio.to_thread, store.get_sync_state),
+            'update_sync_state': partial(asyncio.to_thread, store.update_sync_state),
+            'add_operations': partial(asyncio.to_thread, store.add_operations),
+            'find_first_index': self.history_locator.find_first_index_async,
+            'probe': self.history_locator.probe_async,
+            'fetch_range': partial(self.history_fetcher.fetch_range_async, op_types=HISTORY_OP_TYPES),
+            'switch_node': self.connector.switch_node
+        })
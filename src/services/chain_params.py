@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Chain Parameters Snapshot
+Caches the blockchain inputs of the vote value formula so that a whole
+analysis run can evaluate it in memory
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from network.steem_connector import SteemConnector
+from utils.assets import parse_amount
+from config.settings import API_ENDPOINTS, CHAIN_PARAMS_TTL
+
+logger = logging.getLogger(__name__)
+
+
+class ChainParamsSnapshot:
+    """Point-in-time copy of the chain parameters used to value a vote"""
+
+    def __init__(
+        self,
+        steem_per_vests: float,
+        reward_balance: float,
+        recent_claims: float,
+        median_base: float,
+        median_quote: float,
+        effective_vests: Optional[float] = None,
+        head_block_number: Optional[int] = None,
+        fetched_at: Optional[float] = None
+    ):
+        self.steem_per_vests = steem_per_vests
+        self.reward_balance = reward_balance
+        self.recent_claims = recent_claims
+        self.median_base = median_base
+        self.median_quote = median_quote
+        self.effective_vests = effective_vests
+        self.head_block_number = head_block_number
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+
+    @property
+    def rb_prc(self) -> float:
+        """Reward balance per recent claim"""
+        return self.reward_balance / self.recent_claims
+
+    @property
+    def steem_to_sbd_rate(self) -> float:
+        """Median STEEM/SBD price"""
+        return self.median_base / self.median_quote
+
+    def with_effective_vests(self, effective_vests: float) -> 'ChainParamsSnapshot':
+        """Return a copy of this snapshot bound to a curator's effective vests"""
+        return ChainParamsSnapshot(
+            self.steem_per_vests,
+            self.reward_balance,
+            self.recent_claims,
+            self.median_base,
+            self.median_quote,
+            effective_vests,
+            self.head_block_number,
+            self.fetched_at
+        )
+
+
+class ChainParamsCache:
+    """
+    TTL cache of chain parameter snapshots
+
+    Global parameters (dynamic global properties, reward fund, median price)
+    are shared by every curator, effective vests are cached per curator.
+    Entries are keyed by time window (``now // ttl``) so every entry expires
+    at the next window boundary or on explicit invalidation.
+    """
+
+    def __init__(self, connector: SteemConnector, ttl: float = CHAIN_PARAMS_TTL):
+        self.connector = connector
+        self.ttl = ttl
+        self._global: Optional[Tuple[int, ChainParamsSnapshot]] = None
+        self._vests: Dict[str, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def _window(self, now: Optional[float] = None) -> int:
+        now = now if now is not None else time.time()
+        return int(now // self.ttl) if self.ttl > 0 else int(now * 1000)
+
+    def get_snapshot(self, curator: Optional[str] = None) -> Optional[ChainParamsSnapshot]:
+        """
+        Get the chain parameters for the current time window
+
+        Args:
+            curator: Optional curator whose effective vests are attached
+
+        Returns:
+            Snapshot of chain parameters or None if they can't be fetched
+        """
+        window = self._window()
+
+        snapshot = self._get_cached_global(window)
+        if snapshot is None:
+            snapshot = self._fetch_global()
+            if not snapshot:
+                return None
+            self._set_cached_global(window, snapshot)
+
+        if not curator:
+            return snapshot
+
+        effective_vests = self._get_cached_vests(curator, window)
+        if effective_vests is None:
+            effective_vests = self._fetch_effective_vests(curator)
+            if effective_vests is None:
+                return None
+            self._set_cached_vests(curator, window, effective_vests)
+
+        return snapshot.with_effective_vests(effective_vests)
+
+    async def get_snapshot_async(self, curator: Optional[str] = None) -> Optional[ChainParamsSnapshot]:
+        """Same as get_snapshot, for caches built on an AsyncSteemConnector"""
+        window = self._window()
+
+        snapshot = self._get_cached_global(window)
+        if snapshot is None:
+            try:
+                responses = await self.connector.make_batch_call(self._global_calls())
+                snapshot = self._parse_global(responses)
+            except Exception as e:
+                logger.error(f"Error fetching chain parameters: {e}")
+                return None
+            self._set_cached_global(window, snapshot)
+
+        if not curator:
+            return snapshot
+
+        effective_vests = self._get_cached_vests(curator, window)
+        if effective_vests is None:
+            effective_vests = self._effective_vests_of(curator, await self.connector.get_account(curator))
+            if effective_vests is None:
+                return None
+            self._set_cached_vests(curator, window, effective_vests)
+
+        return snapshot.with_effective_vests(effective_vests)
+
+    def _get_cached_global(self, window: int) -> Optional[ChainParamsSnapshot]:
+        with self._lock:
+            cached = self._global
+        return cached[1] if cached and cached[0] == window else None
+
+    def _set_cached_global(self, window: int, snapshot: ChainParamsSnapshot) -> None:
+        with self._lock:
+            self._global = (window, snapshot)
+
+    def _get_cached_vests(self, curator: str, window: int) -> Optional[float]:
+        with self._lock:
+            cached = self._vests.get(curator)
+        return cached[1] if cached and cached[0] == window else None
+
+    def _set_cached_vests(self, curator: str, window: int, effective_vests: float) -> None:
+        with self._lock:
+            self._vests[curator] = (window, effective_vests)
+
+    def invalidate(self, curator: Optional[str] = None) -> None:
+        """Drop cached parameters (only the curator's vests if a curator is given)"""
+        with self._lock:
+            if curator:
+                self._vests.pop(curator, None)
+            else:
+                self._global = None
+                self._vests.clear()
+
+    def _global_calls(self) -> List[Tuple[str, Any]]:
+        """Calls reading global properties, reward fund and median price"""
+        return [
+            (API_ENDPOINTS['dynamic_global_properties'], []),
+            (API_ENDPOINTS['reward_fund'], ["post"]),
+            (API_ENDPOINTS['median_price'], [])
+        ]
+
+    def _fetch_global(self) -> Optional[ChainParamsSnapshot]:
+        """Fetch global properties, reward fund and median price in one batch"""
+        try:
+            return self._parse_global(self.connector.make_batch_call(self._global_calls()))
+        except Exception as e:
+            logger.error(f"Error fetching chain parameters: {e}")
+            return None
+
+    @staticmethod
+    def _parse_global(responses: List[Dict[str, Any]]) -> ChainParamsSnapshot:
+        """Build a snapshot from the responses of the global calls"""
+        props_response, fund_response, price_response = responses
+
+        props = props_response.get('result')
+        if not props:
+            raise Exception(f"Unable to get global properties: {props_response.get('error')}")
+        total_vesting_fund_steem = parse_amount(props['total_vesting_fund_steem'])
+        total_vesting_shares = parse_amount(props['total_vesting_shares'])
+
+        reward_fund = fund_response.get('result')
+        if not reward_fund:
+            raise Exception(f"Unable to get reward fund: {fund_response.get('error')}")
+
+        reward_balance = parse_amount(reward_fund.get('reward_balance'))
+        if reward_balance is None:
+            raise Exception("Format of reward_fund not recognized")
+
+        price = price_response.get('result')
+        if not price:
+            raise Exception(f"Unable to get price info: {price_response.get('error')}")
+
+        return ChainParamsSnapshot(
+            steem_per_vests=total_vesting_fund_steem / total_vesting_shares,
+            reward_balance=reward_balance,
+            recent_claims=float(reward_fund['recent_claims']),
+            median_base=parse_amount(price['base']),
+            median_quote=parse_amount(price['quote']),
+            head_block_number=props.get('head_block_number')
+        )
+
+    def _fetch_effective_vests(self, curator: str) -> Optional[float]:
+        """Fetch own + received - delegated vests of a curator"""
+        return self._effective_vests_of(curator, self.connector.get_account(curator))
+
+    @staticmethod
+    def _effective_vests_of(curator: str, account: Any) -> Optional[float]:
+        """Own + received - delegated vests of an account object"""
+        if not account:
+            logger.error(f"Unable to get account info for {curator}")
+            return None
+
+        account_vests = parse_amount(account['vesting_shares'])
+        delegated_out = parse_amount(account['delegated_vesting_shares'])
+        received_vests = parse_amount(account['received_vesting_shares'])
+        return account_vests - delegated_out + received_vests
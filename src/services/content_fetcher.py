@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Content Fetcher
+Bulk lookup of posts through batched condenser_api.get_content calls
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterable, Tuple
+
+from network.steem_connector import SteemConnector
+from models.records import PostRecord
+from config.settings import API_ENDPOINTS, RPC_BATCH_SIZE, CONTENT_FETCH_WORKERS
+
+logger = logging.getLogger(__name__)
+
+
+class ContentFetcher:
+    """Fetches many posts in a handful of batched requests"""
+    
+    def __init__(
+        self, 
+        connector: SteemConnector, 
+        batch_size: int = RPC_BATCH_SIZE, 
+        max_workers: int = CONTENT_FETCH_WORKERS
+    ):
+        self.connector = connector
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+    
+    def fetch(self, keys: Iterable[str]) -> Dict[str, PostRecord]:
+        """
+        Fetch posts by "author/permlink" key
+        
+        Args:
+            keys: Post keys, duplicates are fetched once
+        
+        Returns:
+            Dictionary keyed by post key with lightweight post records.
+            Missing posts are omitted.
+        """
+        unique_keys = list(dict.fromkeys(key for key in keys if key))
+        if not unique_keys:
+            return {}
+        
+        chunks = [
+            unique_keys[offset:offset + self.batch_size]
+            for offset in range(0, len(unique_keys), self.batch_size)
+        ]
+        
+        posts = {}
+        if len(chunks) == 1:
+            posts.update(self._fetch_chunk(chunks[0]))
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as executor:
+                for chunk_posts in executor.map(self._fetch_chunk, chunks):
+                    posts.update(chunk_posts)
+        
+        logger.debug(f"Fetched {len(posts)}/{len(unique_keys)} posts in {len(chunks)} batches")
+        return posts
+    
+    async def fetch_async(self, keys: Iterable[str]) -> Dict[str, PostRecord]:
+        """Same as fetch, for fetchers built on an AsyncSteemConnector"""
+        unique_keys = list(dict.fromkeys(key for key in keys if key))
+        if not unique_keys:
+            return {}
+        
+        # The connector sends the batches concurrently
+        responses = await self.connector.make_batch_call(
+            self._content_calls(unique_keys), 
+            batch_size=self.batch_size
+        )
+        return self._parse_posts(unique_keys, responses)
+    
+    def _fetch_chunk(self, keys: List[str]) -> Dict[str, PostRecord]:
+        """Fetch one batch of posts"""
+        calls = self._content_calls(keys)
+        return self._parse_posts(keys, self.connector.make_batch_call(calls, batch_size=len(calls)))
+    
+    @staticmethod
+    def _content_calls(keys: List[str]) -> List[Tuple[str, List[str]]]:
+        calls = []
+        for key in keys:
+            author, _, permlink = key.partition('/')
+            calls.append((API_ENDPOINTS['content'], [author, permlink]))
+        return calls
+    
+    @staticmethod
+    def _parse_posts(keys: List[str], responses: List[Dict[str, Any]]) -> Dict[str, PostRecord]:
+        posts = {}
+        for key, response in zip(keys, responses):
+            content = response.get('result')
+            # Nodes return an empty post (no author) for unknown permlinks
+            if not content or not content.get('author'):
+                logger.debug(f"Post {key} not found: {response.get('error')}")
+                continue
+            
+            posts[key] = PostRecord.from_dict(content)
+        return posts
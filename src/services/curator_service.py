@@ -5,15 +5,27 @@ Main business logic for analyzing curator activity and curation rewards
 """
 
 import logging
+from functools import partial
 from datetime import datetime, timezone, timedelta
-from typing import List, Dict, Any, Optional
-from beem.comment import Comment
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 
 from network.steem_connector import SteemConnector
 from services.vote_calculator import VoteCalculator
+from services import pipeline
+from services.chain_params import ChainParamsSnapshot
+from models.records import VoteOp, CurationRewardOp, EnrichedReward
+from services.content_fetcher import ContentFetcher
+from services.history_locator import HistoryLocator
+from services.history_fetcher import HistoryRangeFetcher
+from services.history_sync import HistorySync, run_steps, sum_rewards_since
+from services.vests_converter import VestsConverter
+from services.voting_power import VotingPowerReplay
+from storage.history_store import HistoryStore
+from utils.timestamps import to_epoch, format_timestamp
 from config.settings import (
-    DEFAULT_BATCH_SIZE, 
     VOTE_BUFFER_DAYS,
+    HISTORY_OP_TYPES,
+    RPC_BATCH_SIZE,
     MESSAGES
 )
 
@@ -23,22 +35,15 @@ logger = logging.getLogger(__name__)
 class CuratorService:
     """Service for analyzing curator activity and rewards"""
     
-    def __init__(self, connector: SteemConnector):
+    def __init__(self, connector: SteemConnector, history_store: Optional[HistoryStore] = None):
         self.connector = connector
         self.vote_calculator = VoteCalculator(connector)
-    
-    def _parse_timestamp(self, timestamp_str: str) -> Optional[datetime]:
-        """Parse timestamp string to datetime object"""
-        if not isinstance(timestamp_str, str):
-            return timestamp_str
-            
-        try:
-            return datetime.strptime(timestamp_str, '%Y-%m-%dT%H:%M:%S').replace(tzinfo=timezone.utc)
-        except ValueError:
-            try:
-                return datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-            except Exception:
-                return None
+        self.content_fetcher = ContentFetcher(connector)
+        self.history_locator = HistoryLocator(connector)
+        self.history_fetcher = HistoryRangeFetcher(connector)
+        self.history_store = history_store or HistoryStore()
+        self.history_sync = HistorySync(self.history_fetcher.chunk_size * self.history_fetcher.max_workers)
+        self.vests_converter = VestsConverter(self.history_store)
     
     def get_user_votes_by_days_back(self, username: str, days_back: int = 7) -> List[Dict[str, Any]]:
         """
@@ -49,160 +54,111 @@ class CuratorService:
             days_back: Number of days to look back for rewards
             
         Returns:
-            List of combined operations with reward and vote data
+            List of combined operations with reward and vote data, newest first
+        """
+        results = [record.to_dict() for record in self.iter_user_votes_by_days_back(username, days_back)]
+        results.reverse()
+        return results
+    
+    def iter_user_votes_by_days_back(
+        self, 
+        username: str, 
+        days_back: int = 7, 
+        progress: Optional[Dict[str, Any]] = None
+    ) -> Iterator[EnrichedReward]:
+        """
+        Stream curation rewards with corresponding vote information
+        
+        Records are yielded oldest first, one enrichment batch at a time, as
+        soon as they are complete.
+        
+        Args:
+            username: Username of the curator
+            days_back: Number of days to look back for rewards
+            progress: Optional dict updated in place with the current stage
+                and the ops_scanned, rewards_found, rewards_matched and
+                enriched counters
+            
+        Yields:
+            Enriched reward records with reward and vote data
         """
-        account = self.connector.get_account(username)
-        if not account:
+        head_index = self.connector.get_history_head_index(username)
+        if head_index is None:
             logger.error(MESSAGES['it']['all_nodes_failed'])
-            return []
+            return
         
-        steem = self.connector.get_steem_instance()
-        if not steem:
-            return []
+        if not self.connector.get_steem_instance():
+            return
         
         # Calculate date ranges
         reward_cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_back)
         vote_cutoff_date = reward_cutoff_date - timedelta(days=VOTE_BUFFER_DAYS)
         
-        # Process operations in batches
-        virtual_op = account.virtual_op_count()
-        batch_size = DEFAULT_BATCH_SIZE
-        start_from = virtual_op
-        stop = 0
+        # Bring the local history store up to date, then answer from it
+        if progress is not None:
+            progress['stage'] = 'syncing'
+        self._sync_history(username, head_index, vote_cutoff_date)
         
-        recent_votes = {}
-        curation_rewards = []
-        still_in_range = True
+        # Fetch chain parameters once for the whole run
+        snapshot = self.vote_calculator.get_chain_params(username)
+        if snapshot:
+            self.vests_converter.record(snapshot)
         
-        while still_in_range and start_from > stop:
-            batch_stop = max(0, start_from - batch_size)
-            try:
-                operations = list(account.history_reverse(
-                    start=start_from, 
-                    stop=batch_stop, 
-                    use_block_num=False
-                ))
-            except Exception as e:
-                logger.warning(f"Errore RPC: {e}. Provo a cambiare nodo...")
-                # Prova a cambiare nodo
-                if hasattr(self.connector, "switch_node"):
-                    switched = self.connector.switch_node()
-                    if switched:
-                        account = self.connector.get_account(username)
-                        steem = self.connector.get_steem_instance()
-                        continue  # Riprova il batch con il nuovo nodo
-                    else:
-                        logger.error("Nessun nodo funzionante disponibile.")
-                        break
-                else:
-                    logger.error("Funzione di switch nodo non disponibile.")
-                    break
-
-            # Process batch of operations
-            for op in operations:
-                op_timestamp = self._parse_timestamp(op.get('timestamp'))
-                
-                # Stop if we've reached operations older than vote cutoff
-                if op_timestamp and op_timestamp < vote_cutoff_date:
-                    still_in_range = False
-                    break
-                
-                # Collect vote operations
-                if op.get('type') == 'vote' and op.get('voter') == username:
-                    vote_key = f"{op.get('author')}/{op.get('permlink')}"
-                    recent_votes[vote_key] = op
-                
-                # Collect curation rewards
-                elif (op.get('type') == 'curation_reward' and 
-                      op_timestamp and 
-                      op_timestamp >= reward_cutoff_date):
-                    curation_rewards.append(op)
-            
-            start_from = batch_stop
+        since = format_timestamp(vote_cutoff_date)
+        replay = VotingPowerReplay(
+            snapshot.effective_vests if snapshot else None,
+            sum_rewards_since(self.history_store, username, since)
+        )
+        
+        operations = pipeline.fetch_stage(self.history_store, username, since, HISTORY_OP_TYPES)
+        # Cutoffs are compared as integer epoch seconds
+        parsed = pipeline.parse_stage(operations)
+        if progress is not None:
+            progress['stage'] = 'analyzing'
+            parsed = pipeline.progress_stage(parsed, progress, 'ops_scanned')
+        replayed = pipeline.replay_stage(parsed, username, replay)
+        relevant = pipeline.filter_stage(replayed, username, to_epoch(reward_cutoff_date))
+        pairs = pipeline.match_stage(relevant, VOTE_BUFFER_DAYS * 86400)
+        if progress is not None:
+            pairs = pipeline.progress_stage(pairs, progress, 'rewards_found')
+            pairs = pipeline.progress_stage(pairs, progress, 'rewards_matched', lambda pair: pair[1] is not None)
         
         # Match rewards with votes and enrich data
-        return self._combine_rewards_with_votes(
-            curation_rewards, 
-            recent_votes, 
-            username, 
-            steem
+        enriched = pipeline.enrich_stage(
+            pairs, 
+            lambda batch: self._enrich_batch(batch, username, snapshot), 
+            RPC_BATCH_SIZE
         )
+        if progress is not None:
+            enriched = pipeline.progress_stage(enriched, progress, 'enriched')
+        yield from enriched
+    
+    def _sync_history(self, username: str, head_index: int, vote_cutoff_date: datetime) -> None:
+        """Download the operations missing from the local history store (see HistorySync.sync)"""
+        run_steps(self.history_sync.sync(username, head_index, vote_cutoff_date), {
+            'get_sync_state': self.history_store.get_sync_state,
+            'update_sync_state': self.history_store.update_sync_state,
+            'add_operations': self.history_store.add_operations,
+            'find_first_index': self.history_locator.find_first_index,
+            'probe': self.history_locator.probe,
+            'fetch_range': partial(self.history_fetcher.fetch_range, op_types=HISTORY_OP_TYPES),
+            'switch_node': self.connector.switch_node
+        })
     
-    def _combine_rewards_with_votes(
+    def _enrich_batch(
         self, 
-        rewards: List[Dict[str, Any]], 
-        votes: Dict[str, Dict[str, Any]], 
+        pairs: List[Tuple[CurationRewardOp, Optional[VoteOp]]], 
         username: str, 
-        steem
-    ) -> List[Dict[str, Any]]:
-        """Combine curation rewards with corresponding vote information"""
-        combined_operations = []
-        
-        for reward in rewards:
-            comment_author = reward.get('comment_author')
-            comment_permlink = reward.get('comment_permlink')
-            vote_key = f"{comment_author}/{comment_permlink}"
-            
-            # Create combined operation
-            combined_op = reward.copy()
-            
-            # Add vote information if available
-            if vote_key in votes:
-                vote_info = votes[vote_key]
-                combined_op['vote_info'] = vote_info
-                
-                try:
-                    # Get comment details
-                    comment = Comment(
-                        f"@{comment_author}/{comment_permlink}", 
-                        blockchain_instance=steem
-                    )
-                    created_post = comment['created']
-                    combined_op['active_votes'] = comment['active_votes']
-
-                    # Ordina active_votes per rshares decrescente
-                    if isinstance(combined_op['active_votes'], list):
-                        combined_op['active_votes'].sort(
-                            key=lambda v: v.get('rshares', 0), reverse=True
-                        )
-                    
-                    # Calculate reward in SP
-                    vesting_shares = float(combined_op['reward']['amount']) / (
-                        10 ** combined_op['reward']['precision']
-                    )
-                    combined_op['reward_sp'] = steem.vests_to_sp(vesting_shares)
-                    
-                    # Calculate vote value
-                    vote_value = self.vote_calculator.calculate_vote_value(
-                        username, 
-                        vote_info['weight']
-                    )
-                    combined_op['vote_value_steem'] = vote_value['steem_value']
-                    
-                    # Calculate timing metrics
-                    vote_time = self._parse_timestamp(vote_info['timestamp'])
-                    if vote_time:
-                        combined_op['voted_after_minutes'] = (
-                            vote_time - created_post
-                        ).total_seconds() / 60
-                        
-                        reward_time = self._parse_timestamp(reward['timestamp'])
-                        if reward_time:
-                            combined_op['days_to_reward'] = (
-                                reward_time - vote_time
-                            ).total_seconds() / 86400
-
-                    # Calcolo efficienza
-                    reward_sp = combined_op.get('reward_sp')
-                    vote_value_steem = combined_op.get('vote_value_steem')
-                    if reward_sp is not None and vote_value_steem and vote_value_steem > 0:
-                        combined_op['efficiency'] = round((reward_sp / vote_value_steem) * 100, 2)
-                    else:
-                        combined_op['efficiency'] = None
-                
-                except (ValueError, TypeError, Exception) as e:
-                    logger.debug(f"Error enriching operation data: {e}")
-            
-            combined_operations.append(combined_op)
+        snapshot: Optional[ChainParamsSnapshot] = None
+    ) -> List[EnrichedReward]:
+        """Combine a batch of curation rewards with their matching vote information"""
+        # Fetch every voted post in bulk instead of one request per reward
+        posts = self.content_fetcher.fetch(reward.key for reward, vote in pairs if vote)
         
-        return combined_operations
+        return pipeline.enrich_pairs(
+            pairs, 
+            posts, 
+            snapshot, 
+            self.vests_converter, 
+            partial(self.vote_calculator.calculate_vote_values, username)
+        )
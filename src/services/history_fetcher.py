@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+"""
+History Range Fetcher
+Downloads a known range of account history indices in parallel chunks
+spread over the healthy nodes, filtering operation types on the node
+when supported
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+from beembase.operationids import operations as operation_ids
+
+from network.steem_connector import SteemConnector
+from config.settings import (
+    API_ENDPOINTS,
+    DEFAULT_BATCH_SIZE,
+    HISTORY_FETCH_WORKERS,
+    NODE_MAX_CONCURRENCY
+)
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_history_entry(index: int, event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Flatten a raw account history entry into the beem operation format
+    
+    Args:
+        index: Operation index in the account history
+        event: Raw entry with block properties and the 'op' payload
+    
+    Returns:
+        Operation fields merged with block properties, 'type' and 'index'
+    """
+    op = event.get('op')
+    if isinstance(op, list):
+        op_type, op_body = op
+    else:
+        op_type = op['type']
+        op_body = op['value']
+    if op_type.endswith('_operation'):
+        op_type = op_type[:-len('_operation')]
+    
+    operation = dict(op_body)
+    operation.update({key: value for key, value in event.items() if key != 'op'})
+    operation['type'] = op_type
+    operation['index'] = index
+    return operation
+
+
+def build_operation_filter(op_types: Iterable[str]) -> Dict[str, int]:
+    """
+    Build the operation filter bitmasks of get_account_history
+    
+    Args:
+        op_types: Operation types without the "_operation" suffix
+        
+    Returns:
+        Dictionary with operation_filter_low and operation_filter_high
+    """
+    filter_low = 0
+    filter_high = 0
+    for op_type in op_types:
+        op_id = operation_ids[op_type]
+        if op_id < 64:
+            filter_low |= 1 << op_id
+        else:
+            filter_high |= 1 << (op_id - 64)
+    return {'operation_filter_low': filter_low, 'operation_filter_high': filter_high}
+
+
+class HistoryRangeFetcher:
+    """
+    Fetches account history index ranges concurrently across nodes
+    
+    When operation types are requested, nodes are asked to filter them
+    server-side with the operation filter bitmasks. Nodes that reject the
+    filter or ignore it are remembered and served unfiltered requests,
+    filtered client-side instead.
+    """
+    
+    def __init__(
+        self, 
+        connector: SteemConnector, 
+        chunk_size: int = DEFAULT_BATCH_SIZE, 
+        max_workers: int = HISTORY_FETCH_WORKERS, 
+        per_node_concurrency: int = NODE_MAX_CONCURRENCY
+    ):
+        self.connector = connector
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.per_node_concurrency = per_node_concurrency
+        self._node_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._filter_support: Dict[Optional[str], bool] = {}
+        self._stats = {
+            'ops_received': 0,
+            'ops_skipped_server_side': 0,
+            'ops_discarded_client_side': 0,
+            'bytes_discarded_client_side': 0
+        }
+        self._lock = threading.Lock()
+    
+    def _get_node_slot(self, node_url: str) -> threading.BoundedSemaphore:
+        """Get the semaphore limiting in-flight requests on a node"""
+        with self._lock:
+            slot = self._node_slots.get(node_url)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_node_concurrency)
+                self._node_slots[node_url] = slot
+            return slot
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get filtering statistics
+        
+        Returns:
+            Counters of operations received, skipped by node-side filtering
+            and discarded client-side, plus an estimate of the bytes saved
+            (skipped operations times the average discarded operation size)
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['filter_support'] = {
+                (url or 'default'): supported for url, supported in self._filter_support.items()
+            }
+        
+        discarded = stats['ops_discarded_client_side']
+        average_size = stats['bytes_discarded_client_side'] / discarded if discarded else None
+        stats['estimated_bytes_saved'] = (
+            int(stats['ops_skipped_server_side'] * average_size) if average_size else None
+        )
+        return stats
+    
+    def split_range(self, start: int, stop: int) -> List[Tuple[int, int]]:
+        """Split [stop, start] into (high, low) chunks, newest first"""
+        chunks = []
+        high = start
+        while high >= stop:
+            low = max(stop, high - self.chunk_size + 1)
+            chunks.append((high, low))
+            high = low - 1
+        return chunks
+    
+    def fetch_range(
+        self, 
+        account: str, 
+        start: int, 
+        stop: int, 
+        op_types: Optional[Iterable[str]] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Fetch every operation with index in [stop, start]
+        
+        Args:
+            account: Account name
+            start: Highest operation index
+            stop: Lowest operation index
+            op_types: Optional operation types to keep, filtered by the
+                node when supported
+            
+        Returns:
+            Normalized operations ordered newest first, or None if any chunk failed
+        """
+        chunks = self.split_range(start, stop)
+        if not chunks:
+            return []
+        
+        op_types = frozenset(op_types) if op_types else None
+        nodes = self.connector.get_working_nodes() or [None]
+        assignments = list(zip(chunks, itertools.cycle(nodes)))
+        
+        workers = min(self.max_workers, len(chunks))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                lambda args: self._fetch_chunk(account, args[0], args[1], op_types), 
+                assignments
+            ))
+        
+        if any(result is None for result in results):
+            return None
+        
+        # Chunks are already ordered newest first
+        return [op for chunk in results for op in chunk]
+    
+    def _request(
+        self, 
+        params: Dict[str, Any], 
+        node_url: Optional[str]
+    ) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Send one history request, holding the node's concurrency slot, returns (answering node, response)"""
+        if not node_url:
+            return self.connector.make_rpc_request_from(API_ENDPOINTS['account_history'], params)
+        with self._get_node_slot(node_url):
+            return self.connector.make_rpc_request_from(API_ENDPOINTS['account_history'], params, node_url)
+    
+    def _fetch_chunk(
+        self, 
+        account: str, 
+        chunk: Tuple[int, int], 
+        node_url: Optional[str],
+        op_types: Optional[frozenset] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Fetch one chunk, preferring the assigned node
+        
+        Filter support is recorded against the node that actually answered,
+        which differs from the assigned one after a failover.
+        """
+        params = self._chunk_params(account, chunk)
+        
+        filtered = self._use_filter(node_url, op_types)
+        if filtered:
+            answered_by, response = self._request(dict(params, **build_operation_filter(op_types)), node_url)
+            filtered = self._check_filter_response(response, answered_by)
+        if not filtered:
+            answered_by, response = self._request(params, node_url)
+        
+        return self._process_chunk(account, chunk, answered_by, op_types, filtered, response)
+    
+    async def fetch_range_async(
+        self, 
+        account: str, 
+        start: int, 
+        stop: int, 
+        op_types: Optional[Iterable[str]] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Same as fetch_range, for fetchers built on an AsyncSteemConnector"""
+        chunks = self.split_range(start, stop)
+        if not chunks:
+            return []
+        
+        op_types = frozenset(op_types) if op_types else None
+        nodes = await self.connector.get_working_nodes() or [None]
+        workers = asyncio.Semaphore(self.max_workers)
+        
+        async def fetch(chunk: Tuple[int, int], node_url: Optional[str]):
+            async with workers:
+                return await self._fetch_chunk_async(account, chunk, node_url, op_types)
+        
+        results = await asyncio.gather(*(
+            fetch(chunk, node_url) for chunk, node_url in zip(chunks, itertools.cycle(nodes))
+        ))
+        
+        if any(result is None for result in results):
+            return None
+        return [op for chunk in results for op in chunk]
+    
+    async def _fetch_chunk_async(
+        self, 
+        account: str, 
+        chunk: Tuple[int, int], 
+        node_url: Optional[str],
+        op_types: Optional[frozenset] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Fetch one chunk, preferring the assigned node (per-node limits live in the connector)"""
+        params = self._chunk_params(account, chunk)
+        method = API_ENDPOINTS['account_history']
+        
+        filtered = self._use_filter(node_url, op_types)
+        if filtered:
+            answered_by, response = await self.connector.make_rpc_request_from(
+                method, dict(params, **build_operation_filter(op_types)), node_url
+            )
+            filtered = self._check_filter_response(response, answered_by)
+        if not filtered:
+            answered_by, response = await self.connector.make_rpc_request_from(method, params, node_url)
+        
+        return self._process_chunk(account, chunk, answered_by, op_types, filtered, response)
+    
+    @staticmethod
+    def _chunk_params(account: str, chunk: Tuple[int, int]) -> Dict[str, Any]:
+        high, low = chunk
+        # Nodes require limit <= start, so the chunk reaching index 0 caps
+        # limit at start; it still returns indices 0..start
+        return {'account': account, 'start': high, 'limit': high - low + 1 if low > 0 else high}
+    
+    def _use_filter(self, node_url: Optional[str], op_types: Optional[frozenset]) -> bool:
+        """Whether to ask the node to filter operations server-side"""
+        return bool(op_types) and self._filter_support.get(node_url) is not False
+    
+    def _check_filter_response(self, response: Optional[Dict[str, Any]], node_url: Optional[str]) -> bool:
+        """Remember nodes rejecting the filter, returns whether the filtered response is usable"""
+        if response is not None and 'error' in response:
+            logger.info(f"Node {node_url} rejected the operation filter: {response['error']}")
+            with self._lock:
+                self._filter_support[node_url] = False
+            return False
+        return True
+    
+    def _process_chunk(
+        self, 
+        account: str, 
+        chunk: Tuple[int, int], 
+        node_url: Optional[str],
+        op_types: Optional[frozenset],
+        filtered: bool,
+        response: Optional[Dict[str, Any]]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Normalize a chunk response, filter it client-side if needed and update the stats
+        
+        node_url is the node that answered, whose filter support is recorded.
+        """
+        high, low = chunk
+        if response is None or 'error' in response:
+            logger.warning(f"Failed to fetch history of {account} [{low}, {high}]")
+            return None
+        
+        result = response['result']
+        history = result.get('history', []) if isinstance(result, dict) else result
+        entries = [(index, event) for index, event in history if low <= index <= high]
+        operations = [normalize_history_entry(index, event) for index, event in entries]
+        
+        if op_types:
+            kept = [op for op in operations if op['type'] in op_types]
+            discarded = len(operations) - len(kept)
+            
+            with self._lock:
+                if filtered:
+                    # A node ignoring the filter answers with other operations too
+                    self._filter_support[node_url] = discarded == 0
+                    if discarded == 0:
+                        self._stats['ops_skipped_server_side'] += (high - low + 1) - len(kept)
+                if discarded:
+                    self._stats['ops_discarded_client_side'] += discarded
+                    self._stats['bytes_discarded_client_side'] += sum(
+                        len(json.dumps(event)) 
+                        for (_, event), op in zip(entries, operations) 
+                        if op['type'] not in op_types
+                    )
+                self._stats['ops_received'] += len(operations)
+            operations = kept
+        else:
+            with self._lock:
+                self._stats['ops_received'] += len(operations)
+        
+        operations.reverse()
+        return operations
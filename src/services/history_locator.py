@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+History Locator
+Finds account history indices by timestamp with a k-ary search over
+small probe reads, so fetches can target exactly the analysis window
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+from network.steem_connector import SteemConnector
+from utils.timestamps import format_timestamp
+from config.settings import API_ENDPOINTS, HISTORY_PROBE_FANOUT
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryLocator:
+    """Locates the first account history index at or after a timestamp"""
+    
+    def __init__(self, connector: SteemConnector, fanout: int = HISTORY_PROBE_FANOUT):
+        self.connector = connector
+        self.fanout = max(1, fanout)
+    
+    def _probe_call(self, account: str, index: int) -> tuple:
+        """Build the JSON-RPC call reading the single operation at an index"""
+        return (
+            API_ENDPOINTS['account_history'],
+            {'account': account, 'start': index, 'limit': 1 if index > 0 else 0}
+        )
+    
+    def probe(self, account: str, indices: List[int]) -> Dict[int, str]:
+        """
+        Read the timestamps of the operations at the given indices in one batch
+        
+        Returns:
+            Dictionary index -> chain timestamp, failed probes are omitted
+        """
+        responses = self.connector.make_batch_call(
+            [self._probe_call(account, index) for index in indices]
+        )
+        return self._parse_probes(indices, responses)
+    
+    async def probe_async(self, account: str, indices: List[int]) -> Dict[int, str]:
+        """Same as probe, for locators built on an AsyncSteemConnector"""
+        responses = await self.connector.make_batch_call(
+            [self._probe_call(account, index) for index in indices]
+        )
+        return self._parse_probes(indices, responses)
+    
+    @staticmethod
+    def _parse_probes(indices: List[int], responses: List[Dict[str, Any]]) -> Dict[int, str]:
+        timestamps = {}
+        for index, response in zip(indices, responses):
+            result = response.get('result')
+            history = result.get('history') if isinstance(result, dict) else result
+            if not history:
+                logger.debug(f"History probe at {index} failed: {response.get('error')}")
+                continue
+            
+            # The node may return a neighbour too, keep the closest entry <= index
+            entries = [entry for entry in history if entry[0] <= index] or history
+            timestamps[index] = entries[-1][1]['timestamp']
+        return timestamps
+    
+    def find_first_index(
+        self, 
+        account: str, 
+        timestamp: Union[datetime, str], 
+        low: int, 
+        high: int
+    ) -> Optional[int]:
+        """
+        Find the first index in [low, high] whose operation is not older than timestamp
+        
+        Each round probes ``fanout`` evenly spaced indices in a single batch
+        request and narrows the range to the interval containing the boundary.
+        
+        Args:
+            account: Account name
+            timestamp: Target time (datetime or chain timestamp string)
+            low: Lowest index to consider
+            high: Highest index to consider
+        
+        Returns:
+            The boundary index (high + 1 if every operation is older), or
+            None if a probe failed
+        """
+        if isinstance(timestamp, datetime):
+            timestamp = format_timestamp(timestamp)
+        
+        lo, hi = low, high + 1
+        rounds = 0
+        while lo < hi:
+            indices = self._round_indices(lo, hi)
+            timestamps = self.probe(account, indices)
+            if len(timestamps) != len(indices):
+                return None
+            rounds += 1
+            lo, hi = self._narrow(indices, timestamps, timestamp, lo, hi)
+        
+        logger.debug(f"Located index {lo} for {account} at {timestamp} in {rounds} rounds")
+        return lo
+    
+    async def find_first_index_async(
+        self, 
+        account: str, 
+        timestamp: Union[datetime, str], 
+        low: int, 
+        high: int
+    ) -> Optional[int]:
+        """Same as find_first_index, for locators built on an AsyncSteemConnector"""
+        if isinstance(timestamp, datetime):
+            timestamp = format_timestamp(timestamp)
+        
+        lo, hi = low, high + 1
+        while lo < hi:
+            indices = self._round_indices(lo, hi)
+            timestamps = await self.probe_async(account, indices)
+            if len(timestamps) != len(indices):
+                return None
+            lo, hi = self._narrow(indices, timestamps, timestamp, lo, hi)
+        return lo
+    
+    def _round_indices(self, lo: int, hi: int) -> List[int]:
+        """Evenly spaced indices to probe in [lo, hi)"""
+        step = max(1, (hi - lo) // (self.fanout + 1))
+        return list(range(lo + step - 1, hi, step))[:self.fanout] or [lo]
+    
+    @staticmethod
+    def _narrow(
+        indices: List[int], 
+        timestamps: Dict[int, str], 
+        timestamp: str, 
+        lo: int, 
+        hi: int
+    ) -> Tuple[int, int]:
+        """Narrow [lo, hi) to the first probe that is not older than the target"""
+        new_lo, new_hi = lo, hi
+        for index in indices:
+            if timestamps[index] >= timestamp:
+                new_hi = index
+                break
+            new_lo = index + 1
+        return new_lo, new_hi
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+History Sync
+Keeps the local history store up to date, independently of the transport:
+the steps are written once as generators yielding the calls they need,
+run by run_steps with blocking callables or by run_steps_async with
+coroutine functions
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Generator, Optional, Tuple
+
+from storage.history_store import HistoryStore
+from utils.assets import parse_amount
+from utils.timestamps import format_timestamp
+from config.settings import NODE_SWITCH_RETRIES
+
+logger = logging.getLogger(__name__)
+
+# A step yields (call name, args) and receives the call's result
+Steps = Generator[Tuple[str, tuple], Any, Any]
+
+
+def run_steps(steps: Steps, calls: Dict[str, Callable[..., Any]]) -> Any:
+    """Run steps with blocking callables, returns the steps' result"""
+    try:
+        name, args = next(steps)
+        while True:
+            name, args = steps.send(calls[name](*args))
+    except StopIteration as stop:
+        return stop.value
+
+
+async def run_steps_async(steps: Steps, calls: Dict[str, Callable[..., Awaitable[Any]]]) -> Any:
+    """Run steps with coroutine functions, returns the steps' result"""
+    try:
+        name, args = next(steps)
+        while True:
+            name, args = steps.send(await calls[name](*args))
+    except StopIteration as stop:
+        return stop.value
+
+
+def sum_rewards_since(store: HistoryStore, username: str, since: str) -> float:
+    """Total VESTS of the stored curation rewards since a chain timestamp"""
+    total = 0.0
+    for op in store.iter_operations(username, since=since, op_types=['curation_reward']):
+        if op.get('curator') == username:
+            total += parse_amount(op.get('reward')) or 0.0
+    return total
+
+
+class HistorySync:
+    """
+    Decides which account history ranges to download into the store
+    
+    The steps yield these calls, which the caller maps to its transport:
+    
+    - get_sync_state(username), update_sync_state(username, high, low,
+      low_timestamp), add_operations(username, operations): the store
+    - find_first_index(username, cutoff_date, low, high) and
+      probe(username, indices): the history locator
+    - fetch_range(username, start, stop): the history fetcher, filtering
+      the analysis operation types
+    - switch_node(attempt): wait (and move node) before a retry, returns
+      whether a node is available
+    """
+    
+    def __init__(self, wave_size: int):
+        """
+        Args:
+            wave_size: Operations fetched per wave (chunk size times workers)
+        """
+        self.wave_size = wave_size
+    
+    def sync(self, username: str, head_index: int, vote_cutoff_date: datetime) -> Steps:
+        """
+        Download the operations missing from the local history store
+        
+        Fetches operations newer than the last synced index and, if the
+        requested window starts before the oldest stored operation, the
+        older operations down to the vote cutoff date.
+        """
+        cutoff = format_timestamp(vote_cutoff_date)
+        state = yield 'get_sync_state', (username,)
+        
+        if state is None:
+            stop, stop_timestamp = yield from self.locate_start_index(username, vote_cutoff_date, 0, head_index)
+            lowest = yield from self.download(username, head_index, stop, cutoff, stop_timestamp)
+            if lowest:
+                yield 'update_sync_state', (username, head_index, *lowest)
+            return
+        
+        high_index = state['high_index']
+        low_index = state['low_index']
+        low_timestamp = state['low_timestamp']
+        
+        # Operations newer than the last sync
+        if head_index > high_index:
+            if (yield from self.download(username, head_index, high_index + 1)):
+                high_index = head_index
+        
+        # Operations older than the oldest stored one, if the window needs them
+        if low_index > 0 and (low_timestamp is None or low_timestamp > cutoff):
+            stop, stop_timestamp = yield from self.locate_start_index(
+                username, vote_cutoff_date, 0, low_index - 1
+            )
+            lowest = yield from self.download(username, low_index - 1, stop, cutoff, stop_timestamp)
+            if lowest:
+                low_index, low_timestamp = lowest
+        
+        yield 'update_sync_state', (username, high_index, low_index, low_timestamp)
+    
+    def locate_start_index(self, username: str, cutoff_date: datetime, low: int, high: int) -> Steps:
+        """
+        Locate the lowest index to download so the range covers cutoff_date
+        
+        Includes the last operation older than the cutoff, so the stored range
+        is known to reach past it. Falls back to low (scan with cutoff) if the
+        index can't be located.
+        
+        Returns:
+            (index, timestamp of the operation at index if known)
+        """
+        index = yield 'find_first_index', (username, cutoff_date, low, high)
+        if index is None:
+            logger.warning(f"Unable to locate history index for {username}, scanning instead")
+            return low, None
+        
+        stop = max(low, min(index, high) - 1) if index > low else low
+        # Filtered downloads may not return the boundary operation itself
+        probes = yield 'probe', (username, [stop])
+        return stop, probes.get(stop)
+    
+    def download(
+        self,
+        username: str,
+        start: int,
+        stop: int,
+        cutoff: Optional[str] = None,
+        stop_timestamp: Optional[str] = None
+    ) -> Steps:
+        """
+        Download operations from index start down to stop into the store
+        
+        The range is fetched in waves of parallel chunks, newest first. A
+        failed wave is retried up to NODE_SWITCH_RETRIES times after
+        switch_node.
+        
+        Args:
+            username: Username of the curator
+            start: Highest operation index to fetch
+            stop: Lowest operation index to fetch
+            cutoff: Optional chain timestamp, the download stops after the
+                first wave reaching operations older than it
+            stop_timestamp: Optional timestamp of the operation at index stop
+        
+        Returns:
+            (lowest index downloaded, its timestamp) or None on failure
+        """
+        start_from = start
+        lowest = (start + 1, None)
+        retries = 0
+        
+        while start_from >= stop:
+            wave_stop = max(stop, start_from - self.wave_size + 1)
+            operations = yield 'fetch_range', (username, start_from, wave_stop)
+            if operations is None:
+                logger.warning("Errore RPC. Provo a cambiare nodo...")
+                # Prova a cambiare nodo, con backoff crescente
+                retries += 1
+                if retries <= NODE_SWITCH_RETRIES and (yield 'switch_node', (retries,)):
+                    continue  # Riprova il batch con il nuovo nodo
+                logger.error("Nessun nodo funzionante disponibile.")
+                return None
+            retries = 0
+            
+            yield 'add_operations', (username, operations)
+            
+            oldest = operations[-1] if operations else None
+            if wave_stop == stop and stop_timestamp:
+                lowest = (wave_stop, stop_timestamp)
+            else:
+                lowest = (wave_stop, oldest.get('timestamp') if oldest else None)
+            
+            # Stop once we've reached operations older than the cutoff
+            if cutoff and oldest and str(oldest.get('timestamp')) < cutoff:
+                break
+            
+            start_from = wave_stop - 1
+        
+        return lowest
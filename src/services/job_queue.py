@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Analysis Job Queue
+Runs curator analyses on a worker pool so web requests return at once
+and clients poll the job for progress
+"""
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from models.analysis_result import AnalysisResult
+from config.settings import JOB_WORKERS, JOB_RETENTION_SECONDS
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+AnalysisRunner = Callable[[str, int, Dict[str, Any]], AnalysisResult]
+
+
+class AnalysisJob:
+    """A queued or running curator analysis and its progress"""
+    
+    def __init__(self, username: str, days_back: int):
+        self.id = uuid.uuid4().hex
+        self.username = username
+        self.days_back = days_back
+        self.status = QUEUED
+        self.progress: Dict[str, Any] = {'stage': QUEUED}
+        self.result: Optional[AnalysisResult] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._finished = threading.Event()
+    
+    @property
+    def key(self) -> Tuple[str, int]:
+        """Identity of the analysis, used to deduplicate in-flight jobs"""
+        return self.username, self.days_back
+    
+    @property
+    def is_finished(self) -> bool:
+        """Whether the job is done or failed"""
+        return self.status in (DONE, FAILED)
+    
+    def finish(self, result: Optional[AnalysisResult], error: Optional[str] = None) -> None:
+        """Store the outcome and wake up the clients waiting for it"""
+        self.finished_at = time.time()
+        self.result = result
+        self.error = error
+        self.status = FAILED if error is not None else DONE
+        self.progress['stage'] = self.status
+        self._finished.set()
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the job finishes, returns whether it did"""
+        return self._finished.wait(timeout)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Status and progress of the job (without the result)"""
+        return {
+            'job_id': self.id,
+            'username': self.username,
+            'days_back': self.days_back,
+            'status': self.status,
+            'progress': dict(self.progress),
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+
+class JobQueue:
+    """
+    Worker pool running analysis jobs
+    
+    Submitting an analysis identical to one still queued or running
+    returns the existing job. Finished jobs are kept for
+    JOB_RETENTION_SECONDS so clients can fetch their result.
+    """
+    
+    def __init__(
+        self,
+        runner: AnalysisRunner,
+        max_workers: int = JOB_WORKERS,
+        retention: float = JOB_RETENTION_SECONDS
+    ):
+        """
+        Args:
+            runner: Function (username, days_back, progress) -> AnalysisResult,
+                updating the progress dict in place
+            max_workers: Analyses running at the same time
+            retention: Seconds finished jobs are kept
+        """
+        self.runner = runner
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analysis-job')
+        self._jobs: Dict[str, AnalysisJob] = {}
+        self._in_flight: Dict[Tuple[str, int], AnalysisJob] = {}
+        self._lock = threading.Lock()
+    
+    def submit(self, username: str, days_back: int) -> Tuple[AnalysisJob, bool]:
+        """
+        Queue an analysis
+        
+        Returns:
+            (job, created) where created is False if an identical job was
+            already queued or running
+        """
+        with self._lock:
+            self._purge()
+            job = self._in_flight.get((username, days_back))
+            if job is not None:
+                return job, False
+            job = AnalysisJob(username, days_back)
+            self._jobs[job.id] = job
+            self._in_flight[job.key] = job
+        self._executor.submit(self._run, job)
+        return job, True
+    
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        """Get a job by id, None if unknown or expired"""
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def _run(self, job: AnalysisJob) -> None:
+        job.status = RUNNING
+        job.started_at = time.time()
+        job.progress['stage'] = RUNNING
+        try:
+            result = self.runner(job.username, job.days_back, job.progress)
+            error = None
+        except Exception as e:
+            logger.error(f"Error running analysis job {job.id} for {job.username}: {e}")
+            result, error = None, str(e)
+        
+        # Finish under the lock, so a job is always either in flight or finished
+        with self._lock:
+            job.finish(result, error)
+            self._in_flight.pop(job.key, None)
+    
+    def _purge(self) -> None:
+        """Forget finished jobs older than the retention time (lock held)"""
+        cutoff = time.time() - self.retention
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.is_finished and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get the number of jobs per status"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        stats = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        for job in jobs:
+            stats[job.status] += 1
+        return stats
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+Analysis Pipeline
+Composable streaming stages turning stored account history into
+enriched curation rewards: fetch -> parse -> filter -> match -> enrich
+"""
+
+import logging
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from models.records import VoteOp, CurationRewardOp, EnrichedReward, PostRecord, operation_from_dict
+from services.chain_params import ChainParamsSnapshot
+from services.vests_converter import VestsConverter
+from services.voting_power import VotingPowerReplay
+from storage.history_store import HistoryStore
+from config.settings import DEFAULT_VOTING_POWER
+
+logger = logging.getLogger(__name__)
+
+HistoryRecord = Union[VoteOp, CurationRewardOp]
+RewardVotePair = Tuple[CurationRewardOp, Optional[VoteOp]]
+
+
+def fetch_stage(
+    store: HistoryStore, 
+    username: str, 
+    since: str, 
+    op_types: Iterable[str]
+) -> Iterator[Dict[str, Any]]:
+    """Stream stored operations of the curator, oldest first"""
+    return store.iter_operations(username, since=since, op_types=op_types, oldest_first=True)
+
+
+def parse_stage(operations: Iterable[Dict[str, Any]]) -> Iterator[HistoryRecord]:
+    """Turn operation dicts into compact records (timestamps as epoch seconds)"""
+    for op in operations:
+        record = operation_from_dict(op)
+        if record is not None:
+            yield record
+
+
+def replay_stage(
+    records: Iterable[HistoryRecord], 
+    username: str, 
+    replay: VotingPowerReplay
+) -> Iterator[HistoryRecord]:
+    """
+    Attach the replayed voting power and effective vests to the curator's votes
+    
+    Must see every operation of the curator oldest first, so it runs
+    before the window filter drops older rewards.
+    """
+    for record in records:
+        if isinstance(record, VoteOp):
+            if record.voter == username:
+                record.voting_power, record.effective_vests = replay.apply_vote(record)
+        elif record.curator == username:
+            replay.observe_reward(record)
+        yield record
+
+
+def filter_stage(
+    records: Iterable[HistoryRecord], 
+    username: str, 
+    reward_cutoff: int
+) -> Iterator[HistoryRecord]:
+    """Keep the curator's votes and the curation rewards inside the window (epoch seconds)"""
+    for record in records:
+        if isinstance(record, VoteOp):
+            if record.voter == username:
+                yield record
+        elif record.timestamp is not None and record.timestamp >= reward_cutoff:
+            yield record
+
+
+def match_stage(
+    relevant: Iterable[HistoryRecord], 
+    vote_retention: int
+) -> Iterator[RewardVotePair]:
+    """
+    Match every curation reward with the curator's vote on the same post
+    
+    Operations must arrive oldest first, so a vote is always seen before
+    its reward and rewards can be yielded immediately. Votes older than
+    vote_retention seconds before the current operation can no longer be rewarded
+    and are dropped, keeping memory bounded on long windows.
+    
+    Yields:
+        (reward, vote) pairs, vote is None when no matching vote was found
+    """
+    votes: Dict[str, VoteOp] = {}
+    
+    for record in relevant:
+        if isinstance(record, VoteOp):
+            # Keep the first vote on a post, like the original newest-first scan did
+            votes.setdefault(record.key, record)
+            continue
+        
+        # Votes are inserted chronologically, so expired ones are at the front
+        if record.timestamp is not None:
+            expiry = record.timestamp - vote_retention
+            while votes:
+                oldest_key = next(iter(votes))
+                vote_timestamp = votes[oldest_key].timestamp
+                if vote_timestamp is None or vote_timestamp >= expiry:
+                    break
+                del votes[oldest_key]
+        
+        yield record, votes.get(record.key)
+
+
+def progress_stage(
+    items: Iterable[Any], 
+    progress: Dict[str, Any], 
+    counter: str, 
+    predicate: Optional[Callable[[Any], bool]] = None
+) -> Iterator[Any]:
+    """Pass items through, counting them (or those matching predicate) in progress[counter]"""
+    progress.setdefault(counter, 0)
+    for item in items:
+        if predicate is None or predicate(item):
+            progress[counter] += 1
+        yield item
+
+
+def batch_stage(items: Iterable[Any], batch_size: int) -> Iterator[List[Any]]:
+    """Group items (e.g. reward/vote pairs) into lists of at most batch_size"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def enrich_stage(
+    pairs: Iterable[RewardVotePair], 
+    enrich_batch: Callable[[List[RewardVotePair]], List[EnrichedReward]], 
+    batch_size: int
+) -> Iterator[EnrichedReward]:
+    """
+    Enrich reward/vote pairs in batches, yielding each batch as soon as it is done
+    
+    Batching lets the enrichment fetch post data in bulk while the number
+    of records held in memory stays bounded by batch_size.
+    """
+    for batch in batch_stage(pairs, batch_size):
+        yield from enrich_batch(batch)
+
+
+def enrich_pairs(
+    pairs: List[RewardVotePair], 
+    posts: Dict[str, PostRecord], 
+    snapshot: Optional[ChainParamsSnapshot], 
+    vests_converter: VestsConverter, 
+    calculate_vote_values: Callable[..., Optional[Dict[str, np.ndarray]]]
+) -> List[EnrichedReward]:
+    """
+    Combine a batch of curation rewards with their vote and post data
+    
+    Pure computation shared by the sync and async services once the
+    batch's posts are fetched.
+    
+    Args:
+        pairs: (reward, vote) pairs of the batch
+        posts: Posts of the voted rewards by "author/permlink" key
+        snapshot: Chain parameters for the run, None if unavailable
+        vests_converter: Converter giving the STEEM per VESTS rate per reward
+        calculate_vote_values: Batch vote value function taking (vote_percents,
+            voting_powers, effective_vests, reward_vests=, snapshot=, steem_per_vests=)
+    """
+    combined_operations = [EnrichedReward(reward, vote) for reward, vote in pairs]
+    
+    matched = []
+    for combined_op in combined_operations:
+        if not combined_op.vote:
+            continue
+        
+        post = posts.get(combined_op.reward.key)
+        if not post:
+            logger.debug(f"Error enriching operation data: Post {combined_op.reward.key} not found")
+            continue
+        if combined_op.reward.reward_vests is None:
+            continue
+        matched.append(combined_op)
+        
+        # Calculate timing metrics
+        vote = combined_op.vote
+        if vote.timestamp is not None and post.created is not None:
+            combined_op.voted_after_minutes = (vote.timestamp - post.created) / 60
+            
+            if combined_op.reward.timestamp is not None:
+                combined_op.days_to_reward = (combined_op.reward.timestamp - vote.timestamp) / 86400
+    
+    if not matched:
+        return combined_operations
+    
+    # Vote value, reward in SP and efficiency for the whole batch in one pass
+    steem_per_vests = None
+    if snapshot:
+        steem_per_vests = vests_converter.steem_per_vests_at(
+            snapshot, 
+            [combined_op.reward.timestamp or snapshot.fetched_at for combined_op in matched]
+        )
+    # Replayed voting state at each vote, current state where unknown
+    voting_powers = [
+        combined_op.vote.voting_power if combined_op.vote.voting_power is not None 
+        else DEFAULT_VOTING_POWER 
+        for combined_op in matched
+    ]
+    effective_vests = None
+    if snapshot and snapshot.effective_vests:
+        effective_vests = [
+            combined_op.vote.effective_vests or snapshot.effective_vests 
+            for combined_op in matched
+        ]
+    values = calculate_vote_values(
+        [combined_op.vote.weight for combined_op in matched],
+        voting_powers,
+        effective_vests,
+        reward_vests=[combined_op.reward.reward_vests for combined_op in matched],
+        snapshot=snapshot,
+        steem_per_vests=steem_per_vests
+    )
+    if values is None:
+        return combined_operations
+    
+    for combined_op, reward_sp, vote_value_steem, efficiency in zip(
+        matched,
+        values['reward_sp'].tolist(),
+        values['steem_value'].tolist(),
+        values['efficiency'].tolist()
+    ):
+        combined_op.reward_sp = reward_sp
+        combined_op.vote_value_steem = vote_value_steem
+        # Calcolo efficienza
+        combined_op.efficiency = None if efficiency != efficiency else efficiency
+    
+    return combined_operations
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Vests Converter
+STEEM per VESTS rates for converting VESTS to STEEM Power locally from
+chain parameter snapshots, optionally at rates this installation recorded
+around each reward's time
+"""
+
+import logging
+import threading
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+from services.chain_params import ChainParamsSnapshot
+from storage.history_store import HistoryStore
+from config.settings import HISTORICAL_VESTS_CONVERSION
+
+logger = logging.getLogger(__name__)
+
+ArrayLike = Union[float, np.ndarray, list]
+
+
+class VestsConverter:
+    """
+    Provides STEEM per VESTS rates without network calls
+    
+    By default every amount is converted at the snapshot's current rate.
+    In historical mode the converter interpolates between the rates
+    recorded by earlier snapshots (persisted in the history store) at the
+    time of each amount.
+    
+    The chain does not expose past rates, so only rates seen by this
+    installation are known: amounts older than the first recorded rate use
+    that rate, which on a fresh store is the current one. Historical mode
+    therefore only becomes accurate for rewards earned after rates have
+    been recorded for a while.
+    """
+    
+    def __init__(
+        self,
+        store: Optional[HistoryStore] = None,
+        historical: bool = HISTORICAL_VESTS_CONVERSION
+    ):
+        self.store = store
+        self.historical = historical
+        self._rates: Optional[List[Tuple[int, float]]] = None
+        self._lock = threading.Lock()
+    
+    def record(self, snapshot: ChainParamsSnapshot) -> None:
+        """Remember the rate of a snapshot for later historical conversions"""
+        point = (int(snapshot.fetched_at), snapshot.steem_per_vests)
+        with self._lock:
+            rates = self._load_rates()
+            if rates and rates[-1][0] == point[0]:
+                return
+            rates.append(point)
+            rates.sort()
+        if self.store:
+            try:
+                self.store.add_vests_rate(point[0], point[1], snapshot.head_block_number)
+            except Exception as e:
+                logger.warning(f"Unable to store STEEM per VESTS rate: {e}")
+    
+    def _load_rates(self) -> List[Tuple[int, float]]:
+        if self._rates is None:
+            self._rates = self.store.get_vests_rates() if self.store else []
+        return self._rates
+    
+    def steem_per_vests_at(
+        self,
+        snapshot: ChainParamsSnapshot,
+        timestamps: Optional[ArrayLike] = None
+    ) -> np.ndarray:
+        """
+        Get the STEEM per VESTS rate to apply at each time
+        
+        Args:
+            snapshot: Current chain parameters snapshot
+            timestamps: Epoch seconds per amount, current rate for all if missing
+        
+        Returns:
+            Array of rates (a 0-d array if no timestamps are given)
+        """
+        if timestamps is None:
+            return np.asarray(snapshot.steem_per_vests, dtype=np.float64)
+        
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if not self.historical:
+            return np.full(timestamps.shape, snapshot.steem_per_vests)
+        
+        with self._lock:
+            rates = list(self._load_rates())
+        rates.append((int(snapshot.fetched_at), snapshot.steem_per_vests))
+        rates.sort()
+        
+        times = np.array([time for time, _ in rates], dtype=np.float64)
+        values = np.array([value for _, value in rates], dtype=np.float64)
+        older = int(np.count_nonzero(timestamps < times[0]))
+        if older:
+            logger.info(
+                f"{older} amounts predate the first recorded STEEM per VESTS rate, "
+                f"converted at the rate of {int(times[0])}"
+            )
+        return np.interp(timestamps, times, values)
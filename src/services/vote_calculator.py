@@ -5,19 +5,25 @@ Handles calculation of vote values based on Steem blockchain parameters
 """
 
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union
+
+import numpy as np
 
 from network.steem_connector import SteemConnector
+from services.chain_params import ChainParamsCache, ChainParamsSnapshot
 from config.settings import DEFAULT_VOTING_POWER, API_ENDPOINTS
 
 logger = logging.getLogger(__name__)
 
+ArrayLike = Union[float, np.ndarray, list]
+
 
 class VoteCalculator:
     """Calculates vote values using Steem blockchain parameters"""
     
     def __init__(self, connector: SteemConnector):
         self.connector = connector
+        self.chain_params = ChainParamsCache(connector)
     
     def get_reward_fund(self, fund_name: str = "post") -> Optional[Dict[str, Any]]:
         """Get reward fund information from blockchain"""
@@ -47,12 +53,17 @@ class VoteCalculator:
             }
         return None
     
+    def get_chain_params(self, curator: Optional[str] = None) -> Optional[ChainParamsSnapshot]:
+        """Get the cached chain parameters snapshot, bound to the curator if given"""
+        return self.chain_params.get_snapshot(curator)
+    
     def calculate_vote_value(
         self, 
         curator: str, 
         vote_percent: int, 
         effective_vests: Optional[float] = None, 
-        voting_power: int = DEFAULT_VOTING_POWER
+        voting_power: int = DEFAULT_VOTING_POWER,
+        snapshot: Optional[ChainParamsSnapshot] = None
     ) -> Dict[str, Any]:
         """
         Calculate vote value based on blockchain parameters
@@ -62,93 +73,18 @@ class VoteCalculator:
             vote_percent: Vote weight percentage
             effective_vests: Optional effective vesting shares
             voting_power: Voting power (default 9200)
+            snapshot: Optional chain parameters snapshot, fetched from the cache if missing
             
         Returns:
             Dictionary with calculated values and formula components
         """
         try:
-            steem = self.connector.get_steem_instance()
-            if not steem:
-                raise Exception("Unable to connect to Steem")
-            
-            # Step 1: Get dynamic global properties
-            props = steem.get_dynamic_global_properties()
-            
-            # Step 2: Calculate SP/VESTS ratio
-            total_vesting_fund_steem = float(props['total_vesting_fund_steem']['amount'])
-            total_vesting_shares = float(props['total_vesting_shares']['amount'])
-            steem_per_vests = total_vesting_fund_steem / total_vesting_shares
-            
-            # Step 3: Get vesting shares
-            vesting_shares = effective_vests
-            if not vesting_shares:
-                account = self.connector.get_account(curator)
-                if not account:
-                    raise Exception('Unable to get account info')
-                
-                account_vests = float(account['vesting_shares'].amount)
-                delegated_out = float(account['delegated_vesting_shares'].amount)
-                received_vests = float(account['received_vesting_shares'].amount)
-                vesting_shares = account_vests - delegated_out + received_vests
-            
-            # Step 4: Convert vests to Steem Power
-            sp = vesting_shares * steem_per_vests
-            
-            # Step 5: Calculate 'r' (SP/spv ratio)
-            r = sp / steem_per_vests
+            if snapshot is None or (not effective_vests and snapshot.effective_vests is None):
+                snapshot = self.get_chain_params(None if effective_vests else curator)
+            if not snapshot:
+                raise Exception("Unable to get chain parameters")
             
-            # Step 6: Calculate 'p' (voting power)
-            weight = vote_percent
-            p = (voting_power * weight / 10000 + 49) / 50
-            
-            # Step 7: Get reward fund
-            reward_fund = self.get_reward_fund("post")
-            if not reward_fund:
-                raise Exception("Unable to get reward fund")
-            
-            # Step 8: Calculate rbPrc
-            recent_claims = float(reward_fund['recent_claims'])
-            
-            if 'reward_balance' in reward_fund:
-                if isinstance(reward_fund['reward_balance'], str):
-                    reward_balance = float(reward_fund['reward_balance'].split(' ')[0])
-                else:
-                    reward_balance = float(reward_fund['reward_balance'].amount)
-            else:
-                raise Exception("Format of reward_fund not recognized")
-                
-            rb_prc = reward_balance / recent_claims
-            
-            # Step 9: Get median price
-            price_info = self.get_current_median_history_price()
-            if not price_info:
-                raise Exception("Unable to get price info")
-            
-            base_amount = float(price_info['base']['amount'])
-            quote_amount = float(price_info['quote']['amount'])
-            steem_to_sbd_rate = base_amount / quote_amount
-            
-            # Step 10: Apply the official Steem formula
-            steem_value = r * p * 100 * rb_prc
-            usd_value = steem_value * steem_to_sbd_rate
-            
-            logger.info(f"""Vote Value Calculation:
-            - SP: {sp:.3f}
-            - Vote Weight: {weight}
-            - Voting Power: {voting_power}
-            - Price ratio: {steem_to_sbd_rate:.4f}
-            - Result: {steem_value:.4f} STEEM (${usd_value:.4f})""")
-            
-            return {
-                "steem_value": float(f"{steem_value:.4f}"),
-                "sbd_value": float(f"{usd_value:.4f}"),
-                "formula": {
-                    "r": r,
-                    "p": p,
-                    "rb_prc": rb_prc,
-                    "median": steem_to_sbd_rate
-                }
-            }
+            return self.compute_vote_value(snapshot, vote_percent, effective_vests, voting_power)
             
         except Exception as e:
             logger.error(f'Error calculating vote value: {str(e)}')
@@ -157,3 +93,167 @@ class VoteCalculator:
                 "sbd_value": 0,
                 "error": str(e)
             }
+    
+    @staticmethod
+    def compute_vote_value(
+        snapshot: ChainParamsSnapshot,
+        vote_percent: int,
+        effective_vests: Optional[float] = None,
+        voting_power: int = DEFAULT_VOTING_POWER
+    ) -> Dict[str, Any]:
+        """
+        Apply the Steem vote value formula to a chain parameters snapshot
+        
+        Args:
+            snapshot: Chain parameters snapshot
+            vote_percent: Vote weight percentage
+            effective_vests: Optional effective vesting shares (snapshot's if missing)
+            voting_power: Voting power (default 9200)
+            
+        Returns:
+            Dictionary with calculated values and formula components
+        """
+        steem_per_vests = snapshot.steem_per_vests
+        
+        vesting_shares = effective_vests or snapshot.effective_vests
+        if not vesting_shares:
+            raise Exception('Unable to get account info')
+        
+        # Convert vests to Steem Power
+        sp = vesting_shares * steem_per_vests
+        
+        # Calculate 'r' (SP/spv ratio)
+        r = sp / steem_per_vests
+        
+        # Calculate 'p' (voting power)
+        weight = vote_percent
+        p = (voting_power * weight / 10000 + 49) / 50
+        
+        # Calculate rbPrc and the median price
+        rb_prc = snapshot.rb_prc
+        steem_to_sbd_rate = snapshot.steem_to_sbd_rate
+        
+        # Apply the official Steem formula
+        steem_value = r * p * 100 * rb_prc
+        usd_value = steem_value * steem_to_sbd_rate
+        
+        logger.debug(f"""Vote Value Calculation:
+        - SP: {sp:.3f}
+        - Vote Weight: {weight}
+        - Voting Power: {voting_power}
+        - Price ratio: {steem_to_sbd_rate:.4f}
+        - Result: {steem_value:.4f} STEEM (${usd_value:.4f})""")
+        
+        return {
+            "steem_value": float(f"{steem_value:.4f}"),
+            "sbd_value": float(f"{usd_value:.4f}"),
+            "formula": {
+                "r": r,
+                "p": p,
+                "rb_prc": rb_prc,
+                "median": steem_to_sbd_rate
+            }
+        }
+    
+    def calculate_vote_values(
+        self, 
+        curator: str, 
+        vote_percents: ArrayLike, 
+        voting_powers: ArrayLike = DEFAULT_VOTING_POWER,
+        effective_vests: Optional[ArrayLike] = None,
+        reward_vests: Optional[ArrayLike] = None,
+        snapshot: Optional[ChainParamsSnapshot] = None,
+        steem_per_vests: Optional[ArrayLike] = None
+    ) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Calculate the values of many votes at once
+        
+        Args:
+            curator: Username of the curator
+            vote_percents: Vote weights
+            voting_powers: Voting powers, one per vote or a single value
+            effective_vests: Effective vesting shares per vote, curator's current if missing
+            reward_vests: Curation rewards in VESTS, enables reward_sp and efficiency
+            snapshot: Optional chain parameters snapshot, fetched from the cache if missing
+            steem_per_vests: Rates converting reward_vests to SP, snapshot's if missing
+            
+        Returns:
+            Dictionary of arrays (see compute_vote_values) or None on error
+        """
+        try:
+            if snapshot is None or (effective_vests is None and snapshot.effective_vests is None):
+                snapshot = self.get_chain_params(None if effective_vests is not None else curator)
+            if not snapshot:
+                raise Exception("Unable to get chain parameters")
+            
+            return self.compute_vote_values(
+                snapshot, vote_percents, voting_powers, effective_vests, reward_vests, steem_per_vests
+            )
+            
+        except Exception as e:
+            logger.error(f'Error calculating vote values: {str(e)}')
+            return None
+    
+    @staticmethod
+    def compute_vote_values(
+        snapshot: ChainParamsSnapshot,
+        vote_percents: ArrayLike,
+        voting_powers: ArrayLike = DEFAULT_VOTING_POWER,
+        effective_vests: Optional[ArrayLike] = None,
+        reward_vests: Optional[ArrayLike] = None,
+        steem_per_vests: Optional[ArrayLike] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Apply the Steem vote value formula to whole arrays in one pass
+        
+        Same formula and rounding as compute_vote_value, scalar arguments
+        are broadcast against the vote weights.
+        
+        Args:
+            snapshot: Chain parameters snapshot
+            vote_percents: Vote weights
+            voting_powers: Voting powers, one per vote or a single value
+            effective_vests: Effective vesting shares (snapshot's if missing)
+            reward_vests: Curation rewards in VESTS, enables reward_sp and efficiency
+            steem_per_vests: Rates converting reward_vests to SP, snapshot's if missing
+            
+        Returns:
+            Dictionary with steem_value and sbd_value arrays, plus reward_sp
+            and efficiency (percent, NaN without a vote value) when
+            reward_vests is given
+        """
+        weights = np.asarray(vote_percents, dtype=np.float64)
+        voting_powers = np.asarray(voting_powers, dtype=np.float64)
+        
+        vesting_shares = np.asarray(
+            effective_vests if effective_vests is not None else snapshot.effective_vests, 
+            dtype=np.float64
+        )
+        if not np.all(vesting_shares > 0):
+            raise Exception('Unable to get account info')
+        
+        # r is the vesting shares, p the used voting power
+        p = (voting_powers * weights / 10000 + 49) / 50
+        steem_value = vesting_shares * p * 100 * snapshot.rb_prc
+        sbd_value = np.round(steem_value * snapshot.steem_to_sbd_rate, 4)
+        steem_value = np.round(steem_value, 4)
+        
+        values = {
+            "steem_value": np.broadcast_to(steem_value, weights.shape).astype(np.float64),
+            "sbd_value": np.broadcast_to(sbd_value, weights.shape).astype(np.float64)
+        }
+        
+        if reward_vests is not None:
+            if steem_per_vests is None:
+                steem_per_vests = snapshot.steem_per_vests
+            reward_sp = np.asarray(reward_vests, dtype=np.float64) * np.asarray(steem_per_vests, dtype=np.float64)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                efficiency = np.where(
+                    values["steem_value"] > 0,
+                    np.round(reward_sp / values["steem_value"] * 100, 2),
+                    np.nan
+                )
+            values["reward_sp"] = reward_sp
+            values["efficiency"] = efficiency
+        
+        return values
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+Account History Store
+Persistent SQLite store of account operations with per-account sync state
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+from config.settings import HISTORY_STORE_PATH
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryStore:
+    """
+    Stores account operations locally so analyses only download new ones
+    
+    For every account the store keeps the contiguous range of operation
+    indices it holds ([low_index, high_index]) together with the timestamp
+    of the oldest stored operation, so callers know which part of the
+    history still has to be fetched from the network. It also records the
+    STEEM per VESTS rate observed over time for historical conversions.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS operations (
+            account TEXT NOT NULL,
+            op_index INTEGER NOT NULL,
+            op_type TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (account, op_index)
+        );
+        CREATE INDEX IF NOT EXISTS idx_operations_timestamp
+            ON operations (account, timestamp);
+        CREATE TABLE IF NOT EXISTS sync_state (
+            account TEXT PRIMARY KEY,
+            high_index INTEGER NOT NULL,
+            low_index INTEGER NOT NULL,
+            low_timestamp TEXT,
+            updated_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS vests_rates (
+            timestamp INTEGER PRIMARY KEY,
+            head_block_number INTEGER,
+            steem_per_vests REAL NOT NULL
+        );
+    """
+    
+    def __init__(self, path: str = HISTORY_STORE_PATH):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(self.SCHEMA)
+    
+    def get_sync_state(self, account: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the synced index range of an account
+        
+        Returns:
+            Dictionary with high_index, low_index, low_timestamp and
+            updated_at, or None if the account was never synced
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM sync_state WHERE account = ?", (account,)
+            ).fetchone()
+        return dict(row) if row else None
+    
+    def update_sync_state(
+        self, 
+        account: str, 
+        high_index: int, 
+        low_index: int, 
+        low_timestamp: Optional[str]
+    ) -> None:
+        """Record the contiguous index range stored for an account"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO sync_state
+                    (account, high_index, low_index, low_timestamp, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (account, high_index, low_index, low_timestamp, time.time())
+            )
+    
+    def add_operations(self, account: str, operations: Iterable[Dict[str, Any]]) -> int:
+        """
+        Store operations of an account (existing indices are overwritten)
+        
+        Returns:
+            Number of operations written
+        """
+        rows = [
+            (
+                account,
+                op['index'],
+                op.get('type', ''),
+                str(op.get('timestamp', '')),
+                json.dumps(op, default=str)
+            )
+            for op in operations
+            if op.get('index') is not None
+        ]
+        if not rows:
+            return 0
+        
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT OR REPLACE INTO operations
+                    (account, op_index, op_type, timestamp, data)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                rows
+            )
+        return len(rows)
+    
+    def iter_operations(
+        self, 
+        account: str, 
+        since: Optional[str] = None, 
+        op_types: Optional[Iterable[str]] = None,
+        oldest_first: bool = False,
+        page_size: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate stored operations of an account, newest first by default
+        
+        Operations are read in pages of page_size rows, so memory stays
+        bounded however long the window is.
+        
+        Args:
+            account: Account name
+            since: Optional chain timestamp ("%Y-%m-%dT%H:%M:%S"), older operations are skipped
+            op_types: Optional operation types to return
+            oldest_first: Iterate in chronological order
+            page_size: Rows read per query
+        """
+        query = "SELECT op_index, data FROM operations WHERE account = ?"
+        params = [account]
+        if since:
+            query += " AND timestamp >= ?"
+            params.append(since)
+        if op_types:
+            op_types = list(op_types)
+            query += f" AND op_type IN ({', '.join('?' for _ in op_types)})"
+            params.extend(op_types)
+        
+        # Keyset pagination on the operation index
+        if oldest_first:
+            query += " AND op_index > ? ORDER BY op_index ASC LIMIT ?"
+            last_index = -1
+        else:
+            query += " AND op_index < ? ORDER BY op_index DESC LIMIT ?"
+            last_index = float('inf')
+        
+        while True:
+            with self._lock:
+                rows = self._conn.execute(query, params + [last_index, page_size]).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield json.loads(row['data'])
+            last_index = rows[-1]['op_index']
+    
+    def add_vests_rate(
+        self, 
+        timestamp: int, 
+        steem_per_vests: float, 
+        head_block_number: Optional[int] = None
+    ) -> None:
+        """Record the STEEM per VESTS rate observed at a time (epoch seconds)"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO vests_rates
+                    (timestamp, head_block_number, steem_per_vests)
+                VALUES (?, ?, ?)
+                """,
+                (timestamp, head_block_number, steem_per_vests)
+            )
+    
+    def get_vests_rates(self) -> List[Tuple[int, float]]:
+        """Get every recorded (timestamp, steem_per_vests) pair, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT timestamp, steem_per_vests FROM vests_rates ORDER BY timestamp"
+            ).fetchall()
+        return [(row['timestamp'], row['steem_per_vests']) for row in rows]
+    
+    def clear(self, account: Optional[str] = None) -> None:
+        """Delete stored operations and sync state (of one account if given)"""
+        with self._lock, self._conn:
+            if account:
+                self._conn.execute("DELETE FROM operations WHERE account = ?", (account,))
+                self._conn.execute("DELETE FROM sync_state WHERE account = ?", (account,))
+            else:
+                self._conn.execute("DELETE FROM operations")
+                self._conn.execute("DELETE FROM sync_state")
+    
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
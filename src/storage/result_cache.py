@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Result Cache
+TTL + LRU cache of finished curator analyses, optionally backed by a
+SQLite file shared between web workers
+"""
+
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from config.settings import RESULT_CACHE_TTL, RESULT_CACHE_SIZE, RESULT_CACHE_PATH
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """
+    Keeps recent analysis results in memory, evicting the least recently used
+    
+    Entries expire ttl seconds after being stored. With a path, entries are
+    also written to a SQLite file so other processes using the same file
+    find them: a memory miss then falls back to the file before counting
+    as a miss.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS results (
+            key TEXT PRIMARY KEY,
+            expires_at REAL NOT NULL,
+            payload BLOB NOT NULL
+        );
+    """
+    
+    def __init__(
+        self,
+        ttl: float = RESULT_CACHE_TTL,
+        max_entries: int = RESULT_CACHE_SIZE,
+        path: Optional[str] = RESULT_CACHE_PATH
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path
+        self._entries: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self._stats = {
+            'hits': 0,
+            'shared_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0
+        }
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if path:
+            if path != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+            with self._lock, self._conn:
+                self._conn.executescript(self.SCHEMA)
+    
+    @staticmethod
+    def make_key(*parts: Hashable) -> str:
+        """Build a cache key from its parts"""
+        return '|'.join(str(part) for part in parts)
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Get a cached value, None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return value
+                del self._entries[key]
+                self._stats['expirations'] += 1
+        
+        value = self._get_shared(key, now)
+        with self._lock:
+            if value is None:
+                self._stats['misses'] += 1
+                return None
+            self._stats['shared_hits'] += 1
+        return value
+    
+    def _get_shared(self, key: str, now: float) -> Optional[Any]:
+        """Look a key up in the shared file, keeping a local copy on hit"""
+        if self._conn is None:
+            return None
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT expires_at, payload FROM results WHERE key = ? AND expires_at > ?",
+                    (key, now)
+                ).fetchone()
+            if row is None:
+                return None
+            expires_at, payload = row
+            value = pickle.loads(payload)
+        except Exception as e:
+            logger.warning(f"Unable to read cached result {key}: {e}")
+            return None
+        self._put_local(key, value, expires_at)
+        return value
+    
+    def set(self, key: str, value: Any) -> None:
+        """Store a value for ttl seconds"""
+        expires_at = time.time() + self.ttl
+        self._put_local(key, value, expires_at)
+        if self._conn is None:
+            return
+        try:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results (key, expires_at, payload) VALUES (?, ?, ?)",
+                    (key, expires_at, payload)
+                )
+                self._conn.execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),))
+        except Exception as e:
+            logger.warning(f"Unable to store cached result {key}: {e}")
+    
+    def _put_local(self, key: str, value: Any, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+    
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Drop one key, or everything if no key is given"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+            if self._conn is not None:
+                with self._conn:
+                    if key is None:
+                        self._conn.execute("DELETE FROM results")
+                    else:
+                        self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss statistics and the current size"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['shared_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] + stats['shared_hits']) / lookups if lookups else 0.0
+        stats['shared'] = self._conn is not None
+        return stats
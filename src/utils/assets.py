@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Asset Helpers
+Parsing of asset amounts in the formats returned by Steem nodes and beem
+"""
+
+from typing import Any, Optional
+
+
+def parse_amount(value: Any) -> Optional[float]:
+    """
+    Parse an asset amount into a float
+    
+    Accepts legacy strings ("1.234 STEEM"), NAI dictionaries
+    ({"amount": "1234", "precision": 3, "nai": "@@000000021"}),
+    beem Amount objects and plain numbers.
+    
+    Args:
+        value: Asset amount in any supported format
+    
+    Returns:
+        Amount as float or None if the format is not recognized
+    """
+    if value is None:
+        return None
+    
+    if isinstance(value, (int, float)):
+        return float(value)
+    
+    if isinstance(value, str):
+        try:
+            return float(value.split(' ')[0])
+        except ValueError:
+            return None
+    
+    if isinstance(value, dict):
+        try:
+            amount = float(value['amount'])
+            precision = value.get('precision')
+            return amount / (10 ** int(precision)) if precision is not None else amount
+        except (KeyError, TypeError, ValueError):
+            return None
+    
+    amount = getattr(value, 'amount', None)
+    return float(amount) if amount is not None else None
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Result Exporters
+Streaming CSV export of analysis results, optionally gzip-compressed, and
+columnar Parquet / Arrow IPC / Feather export
+"""
+
+import csv
+import io
+import zlib
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from models.analysis_result import AnalysisResult
+from config.settings import EXPORT_GZIP_LEVEL, EXPORT_PARQUET_COMPRESSION, EXPORT_FEATHER_COMPRESSION
+
+# Export column (a result column) -> (CSV header, cell formatter taking the row and the analyzed username)
+CSV_COLUMNS: Dict[str, Tuple[str, Callable[[Dict[str, Any], str], Any]]] = {
+    'timestamp': ('Timestamp', lambda item, username: item['timestamp'] or ''),
+    'curator': ('Curator', lambda item, username: item['curator'] or username),
+    'author': ('Author', lambda item, username: item['author']),
+    'permlink': ('Permlink', lambda item, username: item['permlink']),
+    'reward_sp': (
+        'Reward SP',
+        lambda item, username: item['reward_sp'] if item['reward_sp'] is not None else 0
+    ),
+    'weight': (
+        'Vote Weight %',
+        lambda item, username: f"{item['weight'] / 100:.1f}%" if item['weight'] else "0.0%"
+    ),
+    'vote_value': (
+        'Vote Value STEEM',
+        lambda item, username: item['vote_value'] if item['vote_value'] is not None else 0
+    ),
+    'voted_after_minutes': (
+        'Voted After Minutes',
+        lambda item, username: item['voted_after_minutes'] if item['voted_after_minutes'] is not None else ''
+    ),
+    'efficiency': (
+        'Efficiency %',
+        lambda item, username: f"{item['efficiency']:.2f}" if item['efficiency'] else "0.00"
+    )
+}
+
+
+class CsvExporter:
+    """
+    Writes analysis results as CSV one result table at a time
+    
+    Only the current table's rows are formatted at any moment, so the
+    exporter itself holds one table at a time; the memory of a streamed
+    export then depends on its source (see
+    CuratorAnalyzer.iter_curator_results with cache=False). With compress,
+    the output is a gzip stream compressed on the fly.
+    """
+    
+    def __init__(
+        self,
+        columns: Optional[List[str]] = None,
+        compress: bool = False,
+        level: int = EXPORT_GZIP_LEVEL
+    ):
+        """
+        Args:
+            columns: Export columns (keys of CSV_COLUMNS), all by default
+            compress: Whether to gzip the output
+            level: gzip compression level
+        """
+        self.columns = columns or list(CSV_COLUMNS)
+        self.compress = compress
+        self.level = level
+    
+    @staticmethod
+    def parse_columns(value: Optional[str]) -> Optional[List[str]]:
+        """
+        Parse a comma separated column list, None if empty
+        
+        Raises:
+            ValueError: If a column is unknown
+        """
+        if not value:
+            return None
+        columns = [column.strip() for column in value.split(',') if column.strip()]
+        unknown = [column for column in columns if column not in CSV_COLUMNS]
+        if unknown:
+            raise ValueError(f"colonne sconosciute {', '.join(unknown)} (disponibili: {', '.join(CSV_COLUMNS)})")
+        return columns or None
+    
+    @property
+    def mimetype(self) -> str:
+        """Content type of the export"""
+        return 'application/gzip' if self.compress else 'text/csv'
+    
+    @property
+    def extension(self) -> str:
+        """File extension of the export"""
+        return 'csv.gz' if self.compress else 'csv'
+    
+    def iter_chunks(self, results: Iterable[AnalysisResult]) -> Iterator[bytes]:
+        """
+        Yield the encoded CSV, a header chunk then one chunk per result table
+        
+        Tables are expected oldest first (as CuratorAnalyzer.iter_curator_results
+        streams them), so the rows come out in chronological order.
+        """
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31) if self.compress else None
+        formatters = [CSV_COLUMNS[column][1] for column in self.columns]
+        
+        for text in self._iter_text(results, formatters):
+            data = text.encode('utf-8')
+            if compressor is not None:
+                data = compressor.compress(data)
+            if data:
+                yield data
+        
+        if compressor is not None:
+            yield compressor.flush()
+    
+    def _iter_text(
+        self,
+        results: Iterable[AnalysisResult],
+        formatters: List[Callable[[Dict[str, Any], str], Any]]
+    ) -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([CSV_COLUMNS[column][0] for column in self.columns])
+        yield buffer.getvalue()
+        
+        for result in results:
+            buffer.seek(0)
+            buffer.truncate()
+            username = result.username
+            # Tables are newest first, the file is written oldest first
+            rows = list(result.iter_rows(self.columns))
+            rows.reverse()
+            writer.writerows([formatter(item, username) for formatter in formatters] for item in rows)
+            yield buffer.getvalue()
+
+
+def _write_arrow_file(table: pa.Table, sink: BinaryIO) -> None:
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+class ArrowExporter:
+    """
+    Writes analysis results in a columnar format with native types
+    
+    The table is built from the result arrays (see AnalysisResult.to_arrow),
+    so no row is formatted in Python. Formats: parquet, arrow (Arrow IPC
+    file) and feather (Arrow IPC file with compressed buffers).
+    """
+    
+    # Format -> (writer, content type, file extension)
+    FORMATS: Dict[str, Tuple[Callable[[pa.Table, BinaryIO], None], str, str]] = {
+        'parquet': (
+            lambda table, sink: pq.write_table(table, sink, compression=EXPORT_PARQUET_COMPRESSION),
+            'application/vnd.apache.parquet',
+            'parquet'
+        ),
+        'arrow': (_write_arrow_file, 'application/vnd.apache.arrow.file', 'arrow'),
+        'feather': (
+            lambda table, sink: feather.write_feather(table, sink, compression=EXPORT_FEATHER_COMPRESSION),
+            'application/vnd.apache.arrow.file',
+            'feather'
+        )
+    }
+    
+    def __init__(self, export_format: str, columns: Optional[List[str]] = None):
+        """
+        Args:
+            export_format: One of FORMATS
+            columns: Result columns to export, all by default
+        
+        Raises:
+            ValueError: If the format or a column is unknown
+        """
+        if export_format not in self.FORMATS:
+            raise ValueError(f"formato sconosciuto {export_format} (disponibili: csv, {', '.join(self.FORMATS)})")
+        unknown = [column for column in columns or [] if column not in AnalysisResult.COLUMNS]
+        if unknown:
+            raise ValueError(
+                f"colonne sconosciute {', '.join(unknown)} (disponibili: {', '.join(AnalysisResult.COLUMNS)})"
+            )
+        self.export_format = export_format
+        self.columns = columns
+        self._write, self.mimetype, self.extension = self.FORMATS[export_format]
+    
+    def to_table(self, results: Iterable[AnalysisResult]) -> pa.Table:
+        """Concatenate the results (e.g. one per curator) into one Arrow table"""
+        tables = [result.to_arrow(self.columns) for result in results]
+        # Each result has its own curator/author dictionaries, Arrow IPC files need one
+        return pa.concat_tables(tables).unify_dictionaries()
+    
+    def write(self, results: Iterable[AnalysisResult], sink: BinaryIO) -> None:
+        """Write the results to a binary file object"""
+        self._write(self.to_table(results), sink)
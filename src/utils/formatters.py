@@ -5,9 +5,10 @@ Utilities for formatting and displaying analysis results
 """
 
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from tabulate import tabulate
 
+from models.analysis_result import AnalysisResult
 from config.settings import (
     TABLE_FORMAT, 
     MAX_PERMLINK_LENGTH, 
@@ -24,17 +25,21 @@ class ResultFormatter:
         self.language = language
         self.messages = MESSAGES.get(language, MESSAGES['it'])
     
-    def format_results(self, results: List[Dict[str, Any]], username: Optional[str] = None) -> None:
+    def format_results(
+        self, 
+        results: Union[AnalysisResult, List[Dict[str, Any]]], 
+        username: Optional[str] = None
+    ) -> None:
         """Format and display results in a table"""
-        if not results:
+        if not len(results):
             print(self.messages['no_results'])
             return
         
         # Prepare table data
-        table_data = []
-        for op in results:
-            row = self._format_operation_row(op, username)
-            table_data.append(row)
+        if isinstance(results, AnalysisResult):
+            table_data = self._format_result_rows(results, username)
+        else:
+            table_data = [self._format_operation_row(op, username) for op in results]
         
         # Display table
         headers = [
@@ -90,10 +95,40 @@ class ResultFormatter:
             str(estimated_value)
         ]
     
-    def _display_statistics(self, results: List[Dict[str, Any]]) -> None:
+    def _format_result_rows(self, result: AnalysisResult, username: Optional[str] = None) -> List[List[str]]:
+        """Format the rows of a columnar result for the table"""
+        table_data = []
+        columns = [
+            'timestamp', 'author', 'permlink', 'reward_vests', 
+            'weight', 'days_to_reward', 'vote_value'
+        ]
+        for row in result.iter_rows(columns):
+            comment_permlink = row['permlink'] or 'N/A'
+            if len(comment_permlink) > MAX_PERMLINK_LENGTH:
+                comment_permlink = comment_permlink[:MAX_PERMLINK_LENGTH] + '...'
+            
+            reward_vests = row['reward_vests']
+            days_to_reward = row['days_to_reward']
+            vote_value = row['vote_value']
+            
+            table_data.append([
+                row['timestamp'],
+                row['author'] or 'N/A',
+                comment_permlink,
+                f"{reward_vests:.6f} VESTS" if reward_vests is not None else 'N/A',
+                str(row['weight']) if row['weight'] is not None else 'N/A',
+                f"{days_to_reward:.1f}" if days_to_reward is not None else 'N/A',
+                f"${vote_value:.4f}" if vote_value is not None and username else 'N/A'
+            ])
+        return table_data
+    
+    def _display_statistics(self, results: Union[AnalysisResult, List[Dict[str, Any]]]) -> None:
         """Display summary statistics"""
         total_rewards = len(results)
-        rewards_with_votes = len([op for op in results if 'vote_info' in op])
+        if isinstance(results, AnalysisResult):
+            rewards_with_votes = results.operations_with_votes
+        else:
+            rewards_with_votes = len([op for op in results if 'vote_info' in op])
         
         print(f"\n{self.messages['statistics']}")
         print(self.messages['total_rewards'].format(count=total_rewards))
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Timestamps
+Fast parsing of blockchain timestamps (``%Y-%m-%dT%H:%M:%S``, always UTC)
+to datetimes or integer epoch seconds
+"""
+
+import time
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import Any, Optional
+
+CHAIN_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _is_chain_format(value: str) -> bool:
+    """Cheap shape check for ``YYYY-MM-DDTHH:MM:SS``"""
+    return (
+        len(value) == 19
+        and value[4] == '-'
+        and value[7] == '-'
+        and value[10] == 'T'
+        and value[13] == ':'
+        and value[16] == ':'
+    )
+
+
+@lru_cache(maxsize=4096)
+def _days_since_epoch(year: int, month: int, day: int) -> int:
+    """
+    Days from 1970-01-01 to a civil date (history spans few distinct days)
+    
+    Raises:
+        ValueError: If the date does not exist
+    """
+    # Same range checks as datetime, so to_epoch agrees with parse_timestamp
+    date(year, month, day)
+    # Howard Hinnant's days_from_civil
+    year -= month <= 2
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """
+    Parse a chain timestamp to an aware UTC datetime
+    
+    Args:
+        value: Chain timestamp string, ISO 8601 string or datetime
+    
+    Returns:
+        Aware datetime (naive inputs are taken as UTC) or None if unparsable
+    """
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    
+    if not isinstance(value, str):
+        return None
+    
+    try:
+        if _is_chain_format(value):
+            return datetime(
+                int(value[0:4]), int(value[5:7]), int(value[8:10]),
+                int(value[11:13]), int(value[14:16]), int(value[17:19]),
+                tzinfo=timezone.utc
+            )
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def to_epoch(value: Any) -> Optional[int]:
+    """
+    Convert a timestamp to integer UTC epoch seconds
+    
+    Chain-format strings are converted with integer arithmetic only, so
+    cutoffs can be compared as plain integers without building datetimes.
+    
+    Args:
+        value: Chain timestamp string, ISO 8601 string, datetime or epoch number
+    
+    Returns:
+        Epoch seconds or None if unparsable
+    """
+    if isinstance(value, str) and _is_chain_format(value):
+        try:
+            days = _days_since_epoch(int(value[0:4]), int(value[5:7]), int(value[8:10]))
+            hour, minute, second = int(value[11:13]), int(value[14:16]), int(value[17:19])
+            if not (0 <= hour < 24 and 0 <= minute < 60 and 0 <= second < 60):
+                return None
+            return days * 86400 + hour * 3600 + minute * 60 + second
+        except ValueError:
+            return None
+    
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    
+    parsed = parse_timestamp(value)
+    if parsed is None:
+        return None
+    return int((parsed - _EPOCH).total_seconds())
+
+
+def format_timestamp(value: datetime) -> str:
+    """Format a datetime as a chain timestamp (converted to UTC if aware)"""
+    if value.tzinfo:
+        value = value.astimezone(timezone.utc)
+    return value.strftime(CHAIN_TIME_FORMAT)
+
+
+def format_epoch(value: int) -> str:
+    """Format epoch seconds as a chain timestamp"""
+    return time.strftime(CHAIN_TIME_FORMAT, time.gmtime(value))
+
@@ -6,7 +6,9 @@ Input validation utilities
 
 import re
 from typing import Optional
-from datetime import datetime, timezone
+from datetime import datetime
+
+from utils.timestamps import parse_timestamp
 
 
 class InputValidator:
@@ -106,14 +108,6 @@ class InputValidator:
             return True
         
         if isinstance(timestamp, str):
-            try:
-                datetime.strptime(timestamp, '%Y-%m-%dT%H:%M:%S')
-                return True
-            except ValueError:
-                try:
-                    datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                    return True
-                except ValueError:
-                    return False
+            return parse_timestamp(timestamp) is not None
         
         return False
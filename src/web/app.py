@@ -7,10 +7,10 @@ Provides a web interface to analyze curator data with detailed tables
 import sys
 import os
 import logging
-from flask import Flask, render_template, request, jsonify, send_file, url_for
+from flask import Flask, Response, render_template, request, jsonify, send_file, url_for, stream_with_context
 from datetime import datetime
-import csv
 import io
+import itertools
 import json
 import pandas as pd
 
@@ -20,8 +20,11 @@ src_dir = os.path.join(current_dir, '..')
 sys.path.insert(0, src_dir)
 
 from services.analyzer import CuratorAnalyzer
+from models.analysis_result import AnalysisTotals
+from services.job_queue import JobQueue, DONE
+from utils.exporters import CsvExporter, ArrowExporter
 from utils.validators import InputValidator
-from config.settings import DEFAULT_USERNAME, DEFAULT_DAYS_BACK
+from config.settings import DEFAULT_USERNAME, DEFAULT_DAYS_BACK, JOB_MAX_WAIT
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -34,6 +37,7 @@ app = Flask(__name__,
 
 # Global analyzer instance
 analyzer = None
+job_queue = None
 
 def get_analyzer():
     """Get or create analyzer instance"""
@@ -42,23 +46,87 @@ def get_analyzer():
         analyzer = CuratorAnalyzer()
     return analyzer
 
-def calculate_efficiency(vote_value_steem, reward_sp):
-    """Calculate efficiency percentage between vote value and actual reward"""
-    try:
-        if vote_value_steem > 0:
-            return ((reward_sp / vote_value_steem) * 100)
-        return 0
-    except (TypeError, ZeroDivisionError):
-        return 0
+def get_job_queue():
+    """Get or create the background analysis job queue"""
+    global job_queue
+    if job_queue is None:
+        job_queue = JobQueue(
+            lambda username, days_back, progress: get_analyzer().get_curator_result(username, days_back, progress)
+        )
+    return job_queue
 
 @app.route('/')
 def index():
     """Main page with curator analysis form"""
     return render_template('index.html')
 
+def format_rows(result, username):
+    """Format the rows of a result for the web table"""
+    processed_data = []
+    columns = [
+        'timestamp', 'curator', 'author', 'permlink', 'reward_sp', 
+        'weight', 'vote_value', 'voted_after_minutes', 'efficiency'
+    ]
+    for item in result.iter_rows(columns):
+        reward_sp = item['reward_sp']
+        vote_value_steem = item['vote_value']
+        efficiency = item['efficiency']
+        comment_permlink = item['permlink'] or 'N/A'
+        
+        # Convert vote weight to percentage (10000 = 100%)
+        vote_weight_raw = item['weight']
+        vote_weight_percent = f"{vote_weight_raw / 100:.1f}%" if vote_weight_raw else "N/A"
+        
+        # Process row data
+        row = {
+            'timestamp': item['timestamp'],
+            'curator': item['curator'] or username,
+            'comment_author': item['author'] or 'N/A',
+            'comment_permlink': comment_permlink[:30] + '...' if len(comment_permlink) > 30 else comment_permlink,
+            'reward_sp': f"{reward_sp:.6f}" if reward_sp else "0.000000",
+            'vote_weight_percent': vote_weight_percent,
+            'vote_value_steem': f"{vote_value_steem:.6f}" if vote_value_steem else "0.000000",
+            'voted_after_minutes': f"{item['voted_after_minutes']:.1f}" if item['voted_after_minutes'] is not None else 'N/A',
+            'efficiency': f"{efficiency:.2f}%" if efficiency else "0.00%"
+        }
+        
+        processed_data.append(row)
+    
+    return processed_data
+
+def format_statistics(stats, days_back, working_nodes):
+    """Format summary statistics (see AnalysisResult.get_statistics) for the web page"""
+    return {
+        'total_operations': stats['total_operations'],
+        'operations_with_votes': stats['operations_with_votes'],
+        'match_percentage': f"{stats['match_percentage']:.1f}%",
+        'total_reward_sp': f"{stats['total_reward_sp']:.6f}",
+        'total_vote_value': f"{stats['total_vote_value']:.6f}",
+        'average_efficiency': f"{stats['average_efficiency']:.2f}%",
+        'analysis_period': f"{days_back} giorni",
+        'working_nodes': working_nodes
+    }
+
+def build_analysis_payload(result, username, days_back, analyzer):
+    """Build the /analyze response body (table rows and statistics) from a result"""
+    return {
+        'success': True,
+        'data': format_rows(result, username),
+        'statistics': format_statistics(
+            result.get_statistics(), days_back, len(analyzer.get_working_nodes())
+        ),
+        'username': username,
+        'days_back': days_back
+    }
+
 @app.route('/analyze', methods=['POST'])
 def analyze_curator():
-    """Analyze curator and return results"""
+    """
+    Analyze curator and return results
+    
+    Stays synchronous for existing clients; POST /jobs runs the same
+    analysis in the background.
+    """
     try:
         # Get form data
         username = request.form.get('username', DEFAULT_USERNAME).strip()
@@ -85,156 +153,287 @@ def analyze_curator():
             }), 503
         
         # Get curator data
-        raw_data = analyzer.get_curator_data(username, days_back)
+        result = analyzer.get_curator_result(username, days_back)
         
-        if not raw_data:
+        if not len(result):
             return jsonify({
                 'error': 'Nessun dato trovato per questo curator nel periodo specificato.'
             }), 404
         
-        # Process data for display
-        processed_data = []
-        total_reward_sp = 0
-        total_vote_value = 0
-        
-        for item in raw_data:
-            # Extract basic information
-            reward_amount = item.get('reward', {})
-            if isinstance(reward_amount, dict):
-                reward_sp = item.get('reward_sp', 0)
-            else:
-                reward_sp = 0
-                
-            vote_info = item.get('vote_info', {})
-            vote_value_steem = item.get('vote_value_steem', 0)
-            
-            # Calculate efficiency
-            efficiency = calculate_efficiency(vote_value_steem, reward_sp)
-            
-            # Convert vote weight to percentage (10000 = 100%)
-            vote_weight_raw = vote_info.get('weight', 0) if vote_info else 0
-            vote_weight_percent = f"{vote_weight_raw / 100:.1f}%" if vote_weight_raw else "N/A"
-            
-            # Process row data
-            row = {
-                'timestamp': item.get('timestamp', 'N/A'),
-                'curator': item.get('curator', username),
-                'comment_author': item.get('comment_author', 'N/A'),
-                'comment_permlink': item.get('comment_permlink', 'N/A')[:30] + '...' if len(item.get('comment_permlink', '')) > 30 else item.get('comment_permlink', 'N/A'),
-                'reward_sp': f"{reward_sp:.6f}" if reward_sp else "0.000000",
-                'vote_weight_percent': vote_weight_percent,
-                'vote_value_steem': f"{vote_value_steem:.6f}" if vote_value_steem else "0.000000",
-                'voted_after_minutes': f"{item.get('voted_after_minutes', 0):.1f}" if item.get('voted_after_minutes') is not None else 'N/A',
-                'efficiency': f"{efficiency:.2f}%" if efficiency else "0.00%"
-            }
+        return jsonify(build_analysis_payload(result, username, days_back, analyzer))
+    
+    except ValueError as e:
+        return jsonify({'error': f'Errore nei parametri: {str(e)}'}), 400
+    except Exception as e:
+        logger.error(f"Error analyzing curator: {str(e)}")
+        return jsonify({'error': f'Errore durante l\'analisi: {str(e)}'}), 500
+
+def sse_event(event, data):
+    """Encode a Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/analyze/stream')
+def analyze_stream():
+    """
+    Stream an analysis as Server-Sent Events while it is computed
+    
+    Emits a 'rows' event per batch of table rows (oldest batch first, rows
+    newest first within a batch) with the running statistics and progress,
+    then 'done' with the final statistics, or 'failed' with an error.
+    """
+    try:
+        username = request.args.get('username', DEFAULT_USERNAME).strip()
+        days_back = int(request.args.get('days_back', DEFAULT_DAYS_BACK))
+    except ValueError as e:
+        return jsonify({'error': f'Errore nei parametri: {str(e)}'}), 400
+    
+    # Validate inputs
+    if not InputValidator.validate_username(username):
+        return jsonify({
+            'error': 'Username non valido. Deve essere tra 3-16 caratteri (lettere, numeri, punti, trattini).'
+        }), 400
+    
+    if not InputValidator.validate_days_back(days_back):
+        return jsonify({
+            'error': 'Il numero di giorni deve essere tra 1 e 365.'
+        }), 400
+    
+    analyzer = get_analyzer()
+    if not analyzer.test_connection():
+        return jsonify({
+            'error': 'Impossibile connettersi ai nodi Steem. Riprova più tardi.'
+        }), 503
+    working_nodes = len(analyzer.get_working_nodes())
+    
+    def generate():
+        totals = AnalysisTotals()
+        progress = {}
+        try:
+            for result in analyzer.iter_curator_results(username, days_back, progress):
+                totals.add(result)
+                yield sse_event('rows', {
+                    'rows': format_rows(result, username),
+                    'statistics': format_statistics(totals.get_statistics(), days_back, working_nodes),
+                    'progress': dict(progress)
+                })
             
-            processed_data.append(row)
+            if not totals.total_operations:
+                yield sse_event('failed', {
+                    'error': 'Nessun dato trovato per questo curator nel periodo specificato.'
+                })
+                return
             
-            # Accumulate totals for statistics
-            if reward_sp:
-                total_reward_sp += reward_sp
-            if vote_value_steem:
-                total_vote_value += vote_value_steem
-        
-        # Calculate summary statistics
-        total_operations = len(processed_data)
-        operations_with_votes = len([item for item in raw_data if 'vote_info' in item])
-        match_percentage = (operations_with_votes / total_operations * 100) if total_operations > 0 else 0
-        average_efficiency = calculate_efficiency(total_vote_value, total_reward_sp) if total_operations > 0 else 0
-        
-        statistics = {
-            'total_operations': total_operations,
-            'operations_with_votes': operations_with_votes,
-            'match_percentage': f"{match_percentage:.1f}%",
-            'total_reward_sp': f"{total_reward_sp:.6f}",
-            'total_vote_value': f"{total_vote_value:.6f}",
-            'average_efficiency': f"{average_efficiency:.2f}%",
-            'analysis_period': f"{days_back} giorni",
-            'working_nodes': len(analyzer.get_working_nodes())
-        }
+            yield sse_event('done', {
+                'success': True,
+                'statistics': format_statistics(totals.get_statistics(), days_back, working_nodes),
+                'username': username,
+                'days_back': days_back
+            })
+        except Exception as e:
+            logger.error(f"Error streaming analysis: {str(e)}")
+            yield sse_event('failed', {'error': f'Errore durante l\'analisi: {str(e)}'})
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """Queue a curator analysis and return its job id at once"""
+    try:
+        # Get form data
+        username = request.form.get('username', DEFAULT_USERNAME).strip()
+        days_back = int(request.form.get('days_back', DEFAULT_DAYS_BACK))
         
-        return jsonify({
-            'success': True,
-            'data': processed_data,
-            'statistics': statistics,
-            'username': username,
-            'days_back': days_back
-        })
+        # Validate inputs
+        if not InputValidator.validate_username(username):
+            return jsonify({
+                'error': 'Username non valido. Deve essere tra 3-16 caratteri (lettere, numeri, punti, trattini).'
+            }), 400
+        
+        if not InputValidator.validate_days_back(days_back):
+            return jsonify({
+                'error': 'Il numero di giorni deve essere tra 1 e 365.'
+            }), 400
         
+        # Identical analyses already in progress are shared
+        job, created = get_job_queue().submit(username, days_back)
+        response = job.to_dict()
+        response['created'] = created
+        response['status_url'] = url_for('get_job', job_id=job.id)
+        return jsonify(response), 202
+    
     except ValueError as e:
         return jsonify({'error': f'Errore nei parametri: {str(e)}'}), 400
     except Exception as e:
-        logger.error(f"Error analyzing curator: {str(e)}")
+        logger.error(f"Error creating analysis job: {str(e)}")
         return jsonify({'error': f'Errore durante l\'analisi: {str(e)}'}), 500
 
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    """
+    Get the status and progress of an analysis job, with the results once done
+    
+    The optional wait parameter holds the request up to that many seconds
+    (at most JOB_MAX_WAIT) until the job finishes.
+    """
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job non trovato o scaduto.'}), 404
+    
+    try:
+        wait = min(float(request.args.get('wait', 0)), JOB_MAX_WAIT)
+    except ValueError:
+        wait = 0
+    if wait > 0 and not job.is_finished:
+        job.wait(wait)
+    
+    response = job.to_dict()
+    if job.status == DONE:
+        if len(job.result):
+            response.update(build_analysis_payload(job.result, job.username, job.days_back, get_analyzer()))
+        else:
+            response['error'] = 'Nessun dato trovato per questo curator nel periodo specificato.'
+    return jsonify(response)
+
+def get_export_usernames():
+    """Curators of an export: username may be repeated or comma separated"""
+    return [
+        name.strip()
+        for value in request.args.getlist('username')
+        for name in value.split(',')
+        if name.strip()
+    ] or [DEFAULT_USERNAME]
+
 @app.route('/export_csv')
 def export_csv():
-    """Export curator data as CSV"""
+    """
+    Export curator data as CSV, streamed while the analysis runs
+    
+    Query parameters: username (repeatable or comma separated for several
+    curators), days_back, columns (comma separated subset of the export
+    columns) and gzip=1 for a compressed file. Rows are written oldest
+    first, as they are produced.
+    """
     try:
         # Get parameters from query string
-        username = request.args.get('username', DEFAULT_USERNAME)
+        usernames = get_export_usernames()
         days_back = int(request.args.get('days_back', DEFAULT_DAYS_BACK))
+        exporter = CsvExporter(
+            columns=CsvExporter.parse_columns(request.args.get('columns')),
+            compress=request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+        )
+    except ValueError as e:
+        return jsonify({'error': f'Errore nei parametri: {str(e)}'}), 400
+    
+    for username in usernames:
+        if not InputValidator.validate_username(username):
+            return jsonify({
+                'error': 'Username non valido. Deve essere tra 3-16 caratteri (lettere, numeri, punti, trattini).'
+            }), 400
+    
+    if not InputValidator.validate_days_back(days_back):
+        return jsonify({
+            'error': 'Il numero di giorni deve essere tra 1 e 365.'
+        }), 400
+    
+    try:
+        # Get analyzer and start the analyses
+        analyzer = get_analyzer()
+        results = itertools.chain.from_iterable(
+            analyzer.iter_curator_results(username, days_back, cache=False) for username in usernames
+        )
         
+        # Wait for the first rows so an empty export can still be reported
+        first = next(results, None)
+        if first is None:
+            return jsonify({'error': 'Nessun dato da esportare'}), 404
+    except Exception as e:
+        logger.error(f"Error exporting CSV: {str(e)}")
+        return jsonify({'error': f'Errore durante l\'esportazione: {str(e)}'}), 500
+    
+    def generate():
+        try:
+            yield from exporter.iter_chunks(itertools.chain([first], results))
+        except Exception as e:
+            # Headers are already sent, the download ends truncated
+            logger.error(f"Error exporting CSV: {str(e)}")
+    
+    filename = (
+        f"curator_analysis_{'_'.join(usernames)}_{days_back}days_"
+        f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.{exporter.extension}"
+    )
+    return Response(
+        stream_with_context(generate()),
+        mimetype=exporter.mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+@app.route('/export')
+def export_data():
+    """
+    Export curator data as csv, parquet, arrow (Arrow IPC file) or feather
+    
+    Takes the /export_csv parameters plus format. Columnar formats keep
+    native types (UTC timestamps, integer weights, float values with nulls)
+    and are built straight from the result arrays; columns selects among
+    the result columns (see AnalysisResult.COLUMNS).
+    """
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format == 'csv':
+        return export_csv()
+    
+    try:
+        usernames = get_export_usernames()
+        days_back = int(request.args.get('days_back', DEFAULT_DAYS_BACK))
+        columns = request.args.get('columns')
+        exporter = ArrowExporter(
+            export_format,
+            [column.strip() for column in columns.split(',') if column.strip()] if columns else None
+        )
+    except ValueError as e:
+        return jsonify({'error': f'Errore nei parametri: {str(e)}'}), 400
+    
+    for username in usernames:
+        if not InputValidator.validate_username(username):
+            return jsonify({
+                'error': 'Username non valido. Deve essere tra 3-16 caratteri (lettere, numeri, punti, trattini).'
+            }), 400
+    
+    if not InputValidator.validate_days_back(days_back):
+        return jsonify({
+            'error': 'Il numero di giorni deve essere tra 1 e 365.'
+        }), 400
+    
+    try:
         # Get analyzer and fetch data
         analyzer = get_analyzer()
-        raw_data = analyzer.get_curator_data(username, days_back)
+        results = [analyzer.get_curator_result(username, days_back) for username in usernames]
+        results = [result for result in results if len(result)]
         
-        if not raw_data:
+        if not results:
             return jsonify({'error': 'Nessun dato da esportare'}), 404
         
-        # Create CSV in memory
-        output = io.StringIO()
-        writer = csv.writer(output)
-          # Write headers
-        headers = [
-            'Timestamp', 'Curator', 'Author', 'Permlink', 'Reward SP', 
-            'Vote Weight %', 'Vote Value STEEM', 'Voted After Minutes', 'Efficiency %'
-        ]
-        writer.writerow(headers)
-        
-        # Write data rows
-        for item in raw_data:
-            vote_info = item.get('vote_info', {})
-            vote_value_steem = item.get('vote_value_steem', 0)
-            reward_sp = item.get('reward_sp', 0)
-            efficiency = calculate_efficiency(vote_value_steem, reward_sp)
-            
-            # Convert vote weight to percentage
-            vote_weight_raw = vote_info.get('weight', 0) if vote_info else 0
-            vote_weight_percent = vote_weight_raw / 100 if vote_weight_raw else 0
-            
-            row = [
-                item.get('timestamp', ''),
-                item.get('curator', username),
-                item.get('comment_author', ''),
-                item.get('comment_permlink', ''),
-                reward_sp,
-                f"{vote_weight_percent:.1f}%" if vote_weight_percent else "0.0%",
-                vote_value_steem,
-                item.get('voted_after_minutes', ''),
-                f"{efficiency:.2f}" if efficiency else "0.00"
-            ]
-            writer.writerow(row)
-        
-        # Prepare file for download
-        output.seek(0)
-        
-        # Create a BytesIO object for the file download
         mem = io.BytesIO()
-        mem.write(output.getvalue().encode('utf-8'))
+        exporter.write(results, mem)
         mem.seek(0)
         
-        filename = f"curator_analysis_{username}_{days_back}days_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        filename = (
+            f"curator_analysis_{'_'.join(usernames)}_{days_back}days_"
+            f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.{exporter.extension}"
+        )
         
         return send_file(
             mem,
             as_attachment=True,
             download_name=filename,
-            mimetype='text/csv'
+            mimetype=exporter.mimetype
         )
         
     except Exception as e:
-        logger.error(f"Error exporting CSV: {str(e)}")
+        logger.error(f"Error exporting {export_format}: {str(e)}")
         return jsonify({'error': f'Errore durante l\'esportazione: {str(e)}'}), 500
 
 @app.route('/health')
@@ -246,7 +445,13 @@ def health_check():
         return jsonify({
             'status': 'healthy',
             'working_nodes': len(working_nodes),
-            'nodes': working_nodes
+            'nodes': working_nodes,
+            'connection_pool': analyzer.get_pool_stats(),
+            'history_fetch': analyzer.get_history_stats(),
+            'hedging': analyzer.get_hedge_stats(),
+            'rate_limits': analyzer.get_rate_limit_stats(),
+            'result_cache': analyzer.get_cache_stats(),
+            'jobs': get_job_queue().get_stats()
         })
     except Exception as e:
         return jsonify({